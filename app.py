@@ -1,116 +1,94 @@
+import uuid
+import itertools
 import streamlit as st
-import pandas as pd
 import requests
-from fpdf import FPDF
+from app.api_client import BackendClient, BackendUnavailable
+from app.cache import MemoryCache, make_key
+# pandas/numpy (chart), fpdf (offline PDF) and the local calculator are
+# imported where they're used, so the first page load doesn't pay for them
 
 # --- CONFIGURATION ---
-API_URL = "https://career-pivot-api.onrender.com/analyze" # Your Production Backend
+# Your Production Backend: set CAREERPIVOT_API_URL (see app/api_client.py for timeouts/retries)
+
+# Memoize backend responses and PDFs on their inputs so reruns don't re-post
+CACHE_TTL_SECONDS = 600
+CACHE_MAX_ENTRIES = 128
 
 st.set_page_config(page_title="Vantage Digital | CareerPivot", layout="wide")
 
-# --- ADVANCED PDF GENERATOR ---
-def create_pro_pdf(data, profile_inputs):
-    class PDF(FPDF):
-        def header(self):
-            # 1. Dark Blue Brand Banner
-            self.set_fill_color(26, 35, 126) # Deep Navy Blue
-            self.rect(0, 0, 210, 40, 'F')
-            
-            # 2. Title Text (White)
-            self.set_y(10)
-            self.set_font('Arial', 'B', 24)
-            self.set_text_color(255, 255, 255)
-            self.cell(0, 10, 'VANTAGE DIGITAL', 0, 1, 'C')
-            
-            # 3. Subtitle
-            self.set_font('Arial', 'I', 12)
-            self.cell(0, 10, 'Career Transition Strategic Report', 0, 1, 'C')
-            self.ln(20)
-
-        def footer(self):
-            self.set_y(-15)
-            self.set_font('Arial', 'I', 8)
-            self.set_text_color(128, 128, 128)
-            self.cell(0, 10, f'Vantage Digital Strategy • Page {self.page_no()}', 0, 0, 'C')
-
-        def section_title(self, label):
-            self.set_font('Arial', 'B', 14)
-            self.set_fill_color(240, 240, 240) # Light Grey
-            self.set_text_color(0, 0, 0)
-            self.cell(0, 10, f"  {label}", 0, 1, 'L', fill=True)
-            self.ln(4)
-
-        def financial_row(self, label, value):
-            self.set_font('Arial', '', 11)
-            self.cell(100, 8, label, 1) # Border=1 for grid look
-            self.set_font('Arial', 'B', 11)
-            self.cell(0, 8, value, 1, 1) # '1' at end means new line
-
-    pdf = PDF()
-    pdf.add_page()
-    pdf.set_text_color(0, 0, 0)
-
-    # --- SECTION 1: EXECUTIVE SUMMARY ---
-    pdf.section_title("1. Executive Summary")
-    pdf.set_font('Arial', '', 11)
-    
-    # Target Role Context
-    pdf.multi_cell(0, 6, f"Strategic analysis for the transition to: {profile_inputs['role']}.\n"
-                         f"Timeline: {profile_inputs['timeline']} months | Risk Profile: {profile_inputs['risk']}")
-    pdf.ln(5)
-
-    # --- SECTION 2: FINANCIAL HEALTH ---
-    pdf.section_title("2. Financial Reality")
-    
-    # Creating a Grid Table
-    pdf.financial_row("Monthly Burn Rate (Lean)", f"${data['monthly_burn_rate']:,.0f}")
-    pdf.financial_row("Current Runway", f"{data['total_runway_months']:.1f} Months")
-    pdf.financial_row("Capital Gap (Deficit)", f"${data['capital_gap']:,.0f}")
-    
-    if data['capital_gap'] > 0:
-        pdf.set_text_color(192, 57, 43) # Red for warning
-        pdf.cell(0, 10, "  (!) WARNING: Capital deficit detected. Upskilling requires funding.", 0, 1)
-        pdf.set_text_color(0, 0, 0) # Reset
-    else:
-        pdf.set_text_color(39, 174, 96) # Green for good
-        pdf.cell(0, 10, "  (OK) You are fully funded for this transition.", 0, 1)
-        pdf.set_text_color(0, 0, 0)
-
-    pdf.ln(5)
-
-    # --- SECTION 3: AI STRATEGY ---
-    if 'strategy' in data:
-        strategy = data['strategy']
-        pdf.section_title(f"3. AI Strategy Verdict: {strategy['verdict']}")
-        
-        # Action Plan Box
-        pdf.set_fill_color(255, 252, 230) # Light Yellow Background for tips
-        pdf.set_font('Arial', 'B', 11)
-        pdf.cell(0, 8, "Immediate Action Plan:", 0, 1, fill=True)
-        pdf.set_font('Arial', '', 10)
-        
+# --- BACKEND CALL (pooled session, memoized on the payload) ---
+@st.cache_resource
+def get_backend():
+    # One keep-alive client (and circuit breaker) shared by every session
+    return BackendClient()
+
+@st.cache_resource
+def plan_memo():
+    # Finished plans keyed on the payload, bounded and expiring
+    return MemoryCache(max_entries=CACHE_MAX_ENTRIES, ttl_seconds=CACHE_TTL_SECONDS)
+
+def plan_events(data):
+    """Replay a finished plan as the same events /analyze/stream emits."""
+    yield "numbers", data
+    strategy = data.get('strategy')
+    if strategy:
+        yield "verdict", strategy['verdict']
         for action in strategy['action_plan']:
-            safe_text = action.encode('latin-1', 'replace').decode('latin-1')
-            pdf.multi_cell(0, 6, f"- {safe_text}", fill=True)
-        
-        pdf.ln(5)
-
-        # Resources Box
-        pdf.set_fill_color(232, 248, 245) # Light Green/Teal Background
-        pdf.set_font('Arial', 'B', 11)
-        pdf.cell(0, 8, "Recommended Resources:", 0, 1, fill=True)
-        pdf.set_font('Arial', '', 10)
-        
+            yield "action", action
         for res in strategy['resources']:
-            if isinstance(res, dict):
-                name = res.get('name', '').encode('latin-1', 'replace').decode('latin-1')
-                cost = res.get('cost', '').encode('latin-1', 'replace').decode('latin-1')
-                pdf.multi_cell(0, 6, f"- {name} ({cost})", fill=True)
-            else:
-                safe_res = str(res).encode('latin-1', 'replace').decode('latin-1')
-                pdf.multi_cell(0, 6, f"- {safe_res}", fill=True)
+            yield "resource", res
+    yield "done", data
+
+class StreamInterrupted(Exception):
+    """The plan stream ended before its "done" event (backend restart, proxy cut)."""
+
+def session_id():
+    # One ID per browser session, sent to the backend as X-Client-ID for its per-client limit
+    if "client_id" not in st.session_state:
+        st.session_state.client_id = uuid.uuid4().hex
+    return st.session_state.client_id
+
+def stream_plan(payload):
+    key = make_key(**payload)
+    cached = plan_memo().get(key)
+    if cached is not None:
+        yield from plan_events(cached)
+        return
+    # Only complete plans are memoized, never errors or half streams
+    for event, value in get_backend().analyze_stream(payload, session_id()):
+        if event == "done":
+            plan_memo().set(key, value)
+        yield event, value
+
+def offline_plan(cash, brokerage, spouse_income, fixed, variable, fun_money, months, bootcamp_cost, risk):
+    """Local CareerPivotCalculator math in the /analyze response shape."""
+    from app.calculator import FinancialProfile, TransitionPlan, CareerPivotCalculator
+    from app.catalog import resource_catalog
+    profile = FinancialProfile(cash, brokerage, spouse_income, 0, fixed, variable, fun_money, risk)
+    plan = TransitionPlan(target_role, bootcamp_cost, months, 400)
+    metrics = CareerPivotCalculator(profile, plan).run_simulation()['metrics']
+    return {
+        "monthly_burn_rate": metrics['burn_lean'],
+        "total_runway_months": metrics['runway'],
+        "capital_gap": metrics['gap'],
+        "is_financially_ready": metrics['gap'] <= 0,
+        "strategy": {
+            "verdict": "Offline Estimate",
+            "action_plan": ["Our strategy service is unavailable, numbers were computed locally",
+                            "Try again in a minute for your personalized AI plan"],
+            "resources": [r.model_dump() for r in resource_catalog.recommend(target_role, metrics['gap'])]
+        }
+    }
 
-    return pdf.output(dest='S').encode('latin-1')
+# --- PDF REPORT (rendered by the backend's /report service) ---
+@st.cache_data(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS, show_spinner=False)
+def create_pro_pdf(data, profile_inputs):
+    try:
+        return get_backend().post("/report", {"plan": data, "context": profile_inputs}).content
+    except BackendUnavailable:
+        # Same renderer, run locally so the download still works offline
+        from app.reports import render_report
+        return render_report(data, profile_inputs)
 
 # --- MAIN UI ---
 st.title("🚀 CareerPivot")
@@ -148,74 +126,103 @@ if st.button("Generate My Escape Plan"):
             "monthly_expenses": total_expenses,
             "current_savings": total_savings,
             "transition_months": int(months),
-            "emergency_fund_months": 3
+            "emergency_fund_months": 3,
+            "target_role": target_role
         }
 
-        # 3. CALL THE BACKEND
+        # 3. CALL THE BACKEND (streamed, so the strategy appears piece by piece)
         try:
-            response = requests.post(API_URL, json=payload)
-            
-            if response.status_code == 200:
-                data = response.json()
-                
-                # --- DISPLAY FINANCIALS ---
-                st.markdown("### 📊 Financial Snapshot")
-                col1, col2, col3 = st.columns(3)
-                col1.metric("Monthly Burn", f"${data['monthly_burn_rate']:,.0f}")
-                col2.metric("Runway", f"{data['total_runway_months']:.1f} Months")
-                col3.metric("Gap", f"${data['capital_gap']:,.0f}", 
-                            delta_color="inverse" if data['capital_gap'] > 0 else "normal")
-                st.divider()
-
-                # --- DISPLAY AI STRATEGY ---
-                if 'strategy' in data:
-                    strategy = data['strategy']
-                    st.subheader(f"🤖 Verdict: {strategy['verdict']}")
-                    
+            try:
+                events = stream_plan(payload)
+                first = next(events)
+            except BackendUnavailable:
+                st.warning("⚠️ Backend unreachable, showing an offline estimate.")
+                events = plan_events(offline_plan(float(cash), float(brokerage), float(spouse_income),
+                                                  float(fixed), float(variable), float(fun_money),
+                                                  int(months), float(bootcamp_cost), risk))
+                first = next(events)
+
+            data = None
+            verdict_shown = False
+            for event, value in itertools.chain([first], events):
+                if event == "numbers":
+                    # --- DISPLAY FINANCIALS ---
+                    st.markdown("### 📊 Financial Snapshot")
+                    col1, col2, col3 = st.columns(3)
+                    col1.metric("Monthly Burn", f"${value['monthly_burn_rate']:,.0f}")
+                    col2.metric("Runway", f"{value['total_runway_months']:.1f} Months")
+                    col3.metric("Gap", f"${value['capital_gap']:,.0f}", 
+                                delta_color="inverse" if value['capital_gap'] > 0 else "normal")
+                    st.divider()
+
+                    # --- DISPLAY AI STRATEGY (filled in as events arrive) ---
+                    verdict_slot = st.empty()
+                    verdict_slot.caption("🤖 Thinking...")
                     c1, c2 = st.columns(2)
-                    with c1:
-                        st.info("### 🛑 Action Plan")
-                        for action in strategy['action_plan']:
-                            st.write(f"• {action}")
-                    
-                    with c2:
-                        st.success("### 📚 Resources")
-                        for res in strategy['resources']:
-                            if isinstance(res, dict):
-                                st.write(f"**{res.get('name')}**")
-                                st.caption(f"Cost: {res.get('cost')}")
-                            else:
-                                st.write(f"• {res}")
-
-                # --- GENERATE PRO PDF ---
-                st.divider()
-                
-                # Package inputs for the PDF header context
-                user_context = {
-                    "role": target_role,
-                    "timeline": months,
-                    "risk": risk
-                }
-                
-                pdf_bytes = create_pro_pdf(data, user_context)
-                
-                st.download_button(
-                    label="📄 Download Official Strategy Report (PDF)",
-                    data=pdf_bytes,
-                    file_name="Vantage_Digital_Report.pdf",
-                    mime="application/pdf"
-                )
-
-                # --- CHART ---
-                st.subheader("📉 Burn Down Chart")
-                months_range = list(range(13))
-                start_bal = total_savings - float(bootcamp_cost)
-                burn = data['monthly_burn_rate']
-                balances = [start_bal - (burn * m) for m in months_range]
-                st.line_chart(pd.DataFrame(balances, columns=["Projected Savings"]))
-
-            else:
-                st.error(f"Error {response.status_code}: {response.text}")
-
+                    c1.info("### 🛑 Action Plan")
+                    c2.success("### 📚 Resources")
+
+                elif event == "verdict":
+                    verdict_slot.subheader(f"🤖 Verdict: {value}")
+                    verdict_shown = True
+
+                elif event == "action":
+                    c1.write(f"• {value}")
+
+                elif event == "resource":
+                    if isinstance(value, dict):
+                        c2.write(f"**{value.get('name')}**")
+                        c2.caption(f"Cost: {value.get('cost')}")
+                    else:
+                        c2.write(f"• {value}")
+
+                elif event == "done":
+                    data = value
+
+            if data is None:
+                raise StreamInterrupted()
+
+            # Nothing parseable was streamed (e.g. AI offline): show the final strategy as-is
+            strategy = data.get('strategy')
+            if strategy and not verdict_shown:
+                verdict_slot.subheader(f"🤖 Verdict: {strategy['verdict']}")
+                for action in strategy['action_plan']:
+                    c1.write(f"• {action}")
+                for res in strategy['resources']:
+                    c2.write(f"**{res.get('name')}**")
+                    c2.caption(f"Cost: {res.get('cost')}")
+
+            # --- GENERATE PRO PDF ---
+            st.divider()
+            
+            # Package inputs for the PDF header context
+            user_context = {
+                "role": target_role,
+                "timeline": months,
+                "risk": risk
+            }
+            
+            pdf_bytes = create_pro_pdf(data, user_context)
+            
+            st.download_button(
+                label="📄 Download Official Strategy Report (PDF)",
+                data=pdf_bytes,
+                file_name="Vantage_Digital_Report.pdf",
+                mime="application/pdf"
+            )
+
+            # --- CHART ---
+            st.subheader("📉 Burn Down Chart")
+            import pandas as pd
+            from app.projection import project_balances
+            start_bal = total_savings - float(bootcamp_cost)
+            projection = project_balances(start_bal, {"Projected Savings": data['monthly_burn_rate']},
+                                          horizon_months=12)
+            st.line_chart(pd.DataFrame(projection).set_index("months"))
+
+        except StreamInterrupted:
+            st.error("⚠️ The connection dropped before the analysis finished. Please try again.")
+        except requests.HTTPError as e:
+            st.error(f"Error {e.response.status_code}: {e.response.text}")
         except Exception as e:
             st.error(f"Connection Error: {e}")
@@ -0,0 +1,287 @@
+import os
+import math
+import time
+import heapq
+import asyncio
+import itertools
+from collections import OrderedDict
+from typing import Optional
+from app.metrics import registry
+from app.state import shared_state
+
+# --- ADMISSION CONTROL (in front of the Anthropic API) ---
+# Every upstream Claude call first takes a request token (RPM) and its
+# estimated tokens (TPM) from buckets sized to our Anthropic quotas, so we
+# run at the upstream ceiling instead of tripping 429s that would turn every
+# answer into a fallback. Calls that can't go yet wait in a bounded priority
+# queue (paid tiers first); when it's full we shed load with 429 + Retry-After.
+# Per-client limits at the HTTP edge stop one caller from taking the whole quota.
+#
+# Set ANTHROPIC_RPM / ANTHROPIC_TPM to your organization's limits (0 = unlimited).
+# With a shared state backend (app/state.py) the bucket levels live in SQLite,
+# so all workers draw from the one organization quota; the priority queue is
+# still per worker. Those reads and writes run in a thread (the a* methods), and
+# a call's RPM and TPM are taken together in one transaction.
+RPM = float(os.environ.get("ANTHROPIC_RPM", "1000"))
+TPM = float(os.environ.get("ANTHROPIC_TPM", "100000"))
+BURST_SECONDS = float(os.environ.get("ADMISSION_BURST_SECONDS", "5"))
+MAX_QUEUE = int(os.environ.get("ADMISSION_MAX_QUEUE", "200"))
+TOKENS_PER_CALL = int(os.environ.get("ADMISSION_TOKENS_PER_CALL", "400"))
+CLIENT_RPM = float(os.environ.get("CLIENT_RPM", "60"))
+CLIENT_BURST = float(os.environ.get("CLIENT_BURST", "10"))
+# Frontends (e.g. the Streamlit server) whose X-Client-ID header is believed: their
+# requests are limited per end-user session, everyone else's per address
+TRUSTED_PROXIES = frozenset(
+    host.strip() for host in os.environ.get("CLIENT_TRUSTED_PROXIES", "").split(",") if host.strip())
+MAX_CLIENTS = 10_000
+TIER_PRIORITY = {"pro": 0, "standard": 1, "free": 2}
+
+ADMISSIONS = registry.counter(
+    "careerpivot_admissions_total", "Upstream calls by tier and admission outcome")
+
+
+class Overloaded(Exception):
+    """Shed: the admission queue (or a client's quota) is full; retry later."""
+
+    def __init__(self, retry_after: float, reason: str = "overloaded"):
+        super().__init__(f"{reason}, retry after {retry_after:.0f}s")
+        self.retry_after = max(1, math.ceil(retry_after))
+        self.reason = reason
+
+
+class TokenBucket:
+    """Refills `rate` tokens per second up to `capacity`. rate 0 = unlimited."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = max(capacity, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float = 1.0) -> float:
+        """Seconds until `amount` tokens are available (0 = now)."""
+        if not self.rate:
+            return 0.0
+        self._refill()
+        # Requests bigger than the bucket only need a full bucket
+        missing = min(amount, self.capacity) - self.tokens
+        return max(0.0, missing / self.rate)
+
+    def take(self, amount: float = 1.0) -> None:
+        if self.rate:
+            self._refill()
+            self.tokens -= amount
+
+    def try_take(self, amount: float = 1.0) -> float:
+        """Take `amount` if it's there (returns 0), else take nothing and return the wait."""
+        wait = self.wait_time(amount)
+        if not wait:
+            self.take(amount)
+        return wait
+
+    def adjust(self, amount: float) -> None:
+        """Charge (positive) or refund (negative) the difference to an estimate."""
+        if self.rate:
+            self.tokens = min(self.capacity, self.tokens - amount)
+
+    # In-process buckets never block, so the async versions just call through
+    async def atry_take(self, amount: float = 1.0) -> float:
+        return self.try_take(amount)
+
+    async def aadjust(self, amount: float) -> None:
+        self.adjust(amount)
+
+
+class SharedTokenBucket:
+    """TokenBucket whose level is stored in the shared state, so every worker sees the same count."""
+
+    def __init__(self, state, name: str, rate: float, capacity: float):
+        self.state = state
+        self.name = name
+        self.rate = rate
+        self.capacity = max(capacity, 1.0)
+
+    @property
+    def tokens(self) -> float:
+        return self.state.bucket_level(self.name, self.rate, self.capacity)
+
+    def wait_time(self, amount: float = 1.0) -> float:
+        if not self.rate:
+            return 0.0
+        missing = min(amount, self.capacity) - self.tokens
+        return max(0.0, missing / self.rate)
+
+    def take(self, amount: float = 1.0) -> None:
+        if self.rate:
+            self.state.bucket_add(self.name, self.rate, self.capacity, -amount)
+
+    def try_take(self, amount: float = 1.0) -> float:
+        # Check and take in one transaction, so two workers can't both spend the last token
+        if not self.rate:
+            return 0.0
+        return self.state.buckets_try_take([(self.name, self.rate, self.capacity, amount)])
+
+    def adjust(self, amount: float) -> None:
+        if self.rate:
+            self.state.bucket_add(self.name, self.rate, self.capacity, -amount)
+
+    async def atry_take(self, amount: float = 1.0) -> float:
+        return await asyncio.to_thread(self.try_take, amount)
+
+    async def aadjust(self, amount: float) -> None:
+        if self.rate:
+            await asyncio.to_thread(self.adjust, amount)
+
+
+def make_bucket(name: str, rate: float, capacity: float):
+    """A bucket in the shared state if there is one, else in this process."""
+    if shared_state is not None:
+        return SharedTokenBucket(shared_state, name, rate, capacity)
+    return TokenBucket(rate, capacity)
+
+
+class AdmissionController:
+    def __init__(self, rpm: float = RPM, tpm: float = TPM, max_queue: int = MAX_QUEUE,
+                 burst_seconds: float = BURST_SECONDS, priorities: dict = None):
+        self.requests = make_bucket("anthropic:rpm", rpm / 60, rpm / 60 * burst_seconds)
+        self.tokens = make_bucket("anthropic:tpm", tpm / 60, tpm / 60 * burst_seconds)
+        self.max_queue = max_queue
+        self.priorities = priorities or TIER_PRIORITY
+        self._waiters = []  # heap of [priority, seq, tokens, future]
+        self._queued = 0
+        self._seq = itertools.count()
+        self._dispatcher = None
+
+    async def _try_take(self, tokens: float) -> float:
+        """Take one request and `tokens` if both are there (returns 0), else nothing and the wait."""
+        if isinstance(self.requests, SharedTokenBucket):
+            # Both buckets in one transaction, off the event loop
+            takes = [(bucket.name, bucket.rate, bucket.capacity, amount)
+                     for bucket, amount in ((self.requests, 1), (self.tokens, tokens)) if bucket.rate]
+            return await asyncio.to_thread(self.requests.state.buckets_try_take, takes) if takes else 0.0
+        wait = max(self.requests.wait_time(1), self.tokens.wait_time(tokens))
+        if not wait:
+            self.requests.take(1)
+            self.tokens.take(tokens)
+        return wait
+
+    def retry_after(self) -> float:
+        """Rough time to drain the queue at the upstream rate."""
+        if not self.requests.rate:
+            return 1.0
+        return (self._queued + 1) / self.requests.rate
+
+    def check_capacity(self, tier: Optional[str] = None) -> None:
+        """Raise Overloaded now if a new call would be shed (for responses that can't 429 later)."""
+        if self._queued >= self.max_queue:
+            ADMISSIONS.inc(tier=tier or "unknown", outcome="shed")
+            raise Overloaded(self.retry_after())
+
+    async def acquire(self, tier: str, tokens: float = TOKENS_PER_CALL,
+                      timeout: Optional[float] = None) -> float:
+        """
+        Wait for quota for one upstream call; returns the seconds spent queued.
+        Raises Overloaded if the queue is full, asyncio.TimeoutError after `timeout`.
+        """
+        if not self._queued and await self._try_take(tokens) == 0:
+            ADMISSIONS.inc(tier=tier, outcome="admitted")
+            return 0.0
+        self.check_capacity(tier)
+
+        loop = asyncio.get_running_loop()
+        entry = [self.priorities.get(tier, len(self.priorities)), next(self._seq), tokens, loop.create_future()]
+        heapq.heappush(self._waiters, entry)
+        self._queued += 1
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = loop.create_task(self._dispatch())
+
+        start = loop.time()
+        try:
+            await asyncio.wait_for(asyncio.shield(entry[3]), timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            if entry[3].done():
+                # Admitted just as we gave up: the quota is spent either way
+                ADMISSIONS.inc(tier=tier, outcome="abandoned")
+            else:
+                entry[3].cancel()  # The dispatcher skips cancelled entries
+                self._queued -= 1
+                ADMISSIONS.inc(tier=tier, outcome="timeout")
+            raise
+        ADMISSIONS.inc(tier=tier, outcome="queued")
+        return loop.time() - start
+
+    async def _dispatch(self) -> None:
+        # Releases waiters in priority order as fast as the buckets refill
+        while self._waiters:
+            head = self._waiters[0]
+            if head[3].done():
+                heapq.heappop(self._waiters)
+                continue
+            wait = await self._try_take(head[2])
+            if wait > 0:
+                await asyncio.sleep(wait)
+                continue
+            # Other callers may have queued (or given up) while the take was in flight
+            self._waiters.remove(head)
+            heapq.heapify(self._waiters)
+            if head[3].done():
+                continue  # Timed out meanwhile: the quota is spent either way
+            self._queued -= 1
+            head[3].set_result(None)
+
+    async def settle(self, estimated: float, usage: dict) -> None:
+        """Charge the TPM bucket for the tokens a call really used."""
+        used = (usage.get("input_tokens", 0) + usage.get("output_tokens", 0)
+                + usage.get("cache_creation_input_tokens", 0))
+        if used and used != estimated:
+            await self.tokens.aadjust(used - estimated)
+
+    def stats(self) -> dict:
+        return {
+            "queued": self._queued,
+            "max_queue": self.max_queue,
+            "rpm_available": round(self.requests.tokens, 1) if self.requests.rate else -1,
+            "tpm_available": round(self.tokens.tokens, 1) if self.tokens.rate else -1,
+        }
+
+
+class ClientLimiter:
+    """Per-client request rate (token bucket per client id, LRU-bounded or shared)."""
+
+    def __init__(self, rpm: float = CLIENT_RPM, burst: float = CLIENT_BURST, max_clients: int = MAX_CLIENTS):
+        self.rate = rpm / 60
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets = OrderedDict()
+        self._checks = 0
+
+    def _bucket(self, client_id: str):
+        if shared_state is not None:
+            return SharedTokenBucket(shared_state, f"client:{client_id}", self.rate, self.burst)
+        bucket = self._buckets.pop(client_id, None) or TokenBucket(self.rate, self.burst)
+        self._buckets[client_id] = bucket
+        if len(self._buckets) > self.max_clients:
+            self._buckets.popitem(last=False)
+        return bucket
+
+    async def check(self, client_id: str, calls: int = 1) -> None:
+        """Charge `calls` requests to the client, or raise Overloaded without charging."""
+        if not self.rate:
+            return
+        if shared_state is not None:
+            self._checks += 1
+            if self._checks % self.max_clients == 0:
+                await asyncio.to_thread(shared_state.prune_buckets, "client:", 2 * self.burst / self.rate)
+        wait = await self._bucket(client_id).atry_take(calls)
+        if wait > 0:
+            ADMISSIONS.inc(tier="client", outcome="limited")
+            raise Overloaded(wait, "client rate limit exceeded")
+
+
+admission = AdmissionController()
+client_limiter = ClientLimiter()
@@ -0,0 +1,139 @@
+import os
+import json
+import time
+import random
+import threading
+from typing import Optional
+import requests
+from requests.adapters import HTTPAdapter
+
+# --- BACKEND CLIENT (used by the Streamlit frontend) ---
+# One keep-alive session per frontend process with bounded timeouts, jittered
+# retries on 5xx / connection errors and a circuit breaker, so a slow or dead
+# backend can never hang a Streamlit thread.
+API_BASE_URL = os.environ.get("CAREERPIVOT_API_URL", "https://career-pivot-api.onrender.com")
+CONNECT_TIMEOUT = float(os.environ.get("CAREERPIVOT_CONNECT_TIMEOUT", "3.05"))
+READ_TIMEOUT = float(os.environ.get("CAREERPIVOT_READ_TIMEOUT", "30"))
+MAX_RETRIES = int(os.environ.get("CAREERPIVOT_MAX_RETRIES", "2"))
+BACKOFF_SECONDS = float(os.environ.get("CAREERPIVOT_BACKOFF", "0.5"))
+POOL_SIZE = int(os.environ.get("CAREERPIVOT_POOL_SIZE", "10"))
+
+
+class BackendUnavailable(Exception):
+    """The backend is down, timing out or the circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    closed    -> requests flow; `failure_threshold` failures in a row opens it
+    open      -> requests fail fast for `reset_timeout` seconds
+    half-open -> calls are let through again; a success closes it, a failure re-opens it
+    """
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        return self.state != "open"
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold or self.opened_at is not None:
+                self.opened_at = time.monotonic()
+
+
+class BackendClient:
+    def __init__(self, base_url: str = API_BASE_URL,
+                 connect_timeout: float = CONNECT_TIMEOUT,
+                 read_timeout: float = READ_TIMEOUT,
+                 max_retries: int = MAX_RETRIES,
+                 backoff: float = BACKOFF_SECONDS,
+                 pool_size: int = POOL_SIZE,
+                 breaker: CircuitBreaker = None):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.breaker = breaker or CircuitBreaker()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def post(self, path: str, payload: dict, **kwargs) -> requests.Response:
+        """
+        POST with retries. 4xx responses raise requests.HTTPError straight away;
+        exhausted retries or an open breaker raise BackendUnavailable.
+        """
+        if not self.breaker.allow():
+            raise BackendUnavailable("Backend circuit open, skipping call")
+
+        last_error = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                # Exponential backoff with full jitter
+                time.sleep(random.uniform(0, self.backoff * 2 ** (attempt - 1)))
+            try:
+                response = self.session.post(
+                    f"{self.base_url}{path}", json=payload, timeout=self.timeout, **kwargs
+                )
+            except (requests.ConnectionError, requests.Timeout) as e:
+                last_error = e
+                continue
+
+            if response.status_code >= 500:
+                last_error = requests.HTTPError(f"{response.status_code}: {response.text}",
+                                                response=response)
+                continue
+
+            self.breaker.record_success()
+            response.raise_for_status()
+            return response
+
+        self.breaker.record_failure()
+        raise BackendUnavailable(str(last_error))
+
+    @staticmethod
+    def client_headers(client_id: Optional[str]) -> dict:
+        # The end user behind this frontend, so the backend's per-client limit isn't shared by all of them
+        return {"X-Client-ID": client_id} if client_id else {}
+
+    def analyze(self, payload: dict, client_id: Optional[str] = None) -> dict:
+        return self.post("/analyze", payload, headers=self.client_headers(client_id)).json()
+
+    def stream(self, path: str, payload: dict, client_id: Optional[str] = None):
+        """Yield (event, data) pairs from a Server-Sent Events endpoint."""
+        response = self.post(path, payload, stream=True, headers=self.client_headers(client_id))
+        event, data = "message", []
+        with response:
+            for line in response.iter_lines(decode_unicode=True):
+                if not line:
+                    if data:
+                        yield event, json.loads("\n".join(data))
+                    event, data = "message", []
+                elif line.startswith("event:"):
+                    event = line[6:].strip()
+                elif line.startswith("data:"):
+                    data.append(line[5:].strip())
+
+    def analyze_stream(self, payload: dict, client_id: Optional[str] = None):
+        return self.stream("/analyze/stream", payload, client_id)
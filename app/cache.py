@@ -0,0 +1,217 @@
+import os
+import json
+import time
+import asyncio
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional
+from app.state import connect, BACKEND as STATE_BACKEND, PATH as STATE_PATH
+
+# --- AI STRATEGY CACHE ---
+# The strategy prompt runs at temperature=0 and is a pure function of the
+# profile numbers, so identical prompts can safely reuse a previous answer.
+# Two interchangeable backends share the same get/set/stats interface (and
+# aget/aset/aget_many for async code: SQLite reads and writes run in a thread,
+# so the event loop never waits on the file lock):
+#   STRATEGY_CACHE_BACKEND=memory  (default) in-process LRU with TTL
+#   STRATEGY_CACHE_BACKEND=sqlite  on-disk LRU with TTL, survives restarts
+#   STRATEGY_CACHE_BACKEND=off     disable caching
+
+
+def make_key(**parts) -> str:
+    """Canonical content hash of the prompt inputs (order/whitespace independent)."""
+    canonical = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class MemoryCache:
+    """Bounded LRU with per-entry TTL."""
+
+    backend = "memory"
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.evictions += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: dict) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def get_many(self, keys) -> dict:
+        return {key: self.get(key) for key in keys}
+
+    # In memory nothing blocks, so the async versions just call through
+    async def aget(self, key: str) -> Optional[dict]:
+        return self.get(key)
+
+    async def aset(self, key: str, value: dict) -> None:
+        self.set(key, value)
+
+    async def aget_many(self, keys) -> dict:
+        return self.get_many(keys)
+
+    def size(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.backend,
+            "size": self.size(),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+class SQLiteCache(MemoryCache):
+    """
+    LRU with per-entry TTL like MemoryCache, persisted to a local SQLite file.
+    Reads refresh an entry's place at most every TOUCH_SECONDS, and the table
+    is trimmed back to max_entries every TRIM_EVERY writes, so it may briefly
+    hold up to TRIM_EVERY extra entries.
+    """
+
+    backend = "sqlite"
+    # A hit writes its access time only when the stored one is older than this
+    TOUCH_SECONDS = 60
+    TRIM_EVERY = 64
+
+    def __init__(self, path: str, max_entries: int = 100_000, ttl_seconds: float = 86400):
+        super().__init__(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self.path = path
+        self._writes = 0
+        # WAL: several worker processes can share one cache file
+        self._conn = connect(path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS strategy_cache ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+            " created_at REAL NOT NULL, expires_at REAL NOT NULL, accessed_at REAL NOT NULL DEFAULT 0)"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(strategy_cache)")}
+        if "accessed_at" not in columns:
+            # Files from before reads counted: last access = creation
+            self._conn.execute("ALTER TABLE strategy_cache ADD COLUMN accessed_at REAL NOT NULL DEFAULT 0")
+            self._conn.execute("UPDATE strategy_cache SET accessed_at = created_at")
+        self._conn.execute("DROP INDEX IF EXISTS strategy_cache_created")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS strategy_cache_accessed ON strategy_cache (accessed_at)"
+        )
+
+    def get(self, key: str) -> Optional[dict]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at, accessed_at FROM strategy_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            if row[1] < now:
+                self._conn.execute("DELETE FROM strategy_cache WHERE key = ?", (key,))
+                self.evictions += 1
+                self.misses += 1
+                return None
+            if now - row[2] > self.TOUCH_SECONDS:
+                self._conn.execute("UPDATE strategy_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return json.loads(row[0])
+
+    def set(self, key: str, value: dict) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO strategy_cache VALUES (?, ?, ?, ?, ?)",
+                (key, json.dumps(value), now, now + self.ttl_seconds, now),
+            )
+            self._writes += 1
+            if self._writes % self.TRIM_EVERY == 0:
+                self._trim(now)
+
+    def _trim(self, now: float) -> None:
+        # Expired entries first, then the least recently used beyond max_entries
+        cur = self._conn.execute("DELETE FROM strategy_cache WHERE expires_at < ?", (now,))
+        self.evictions += cur.rowcount
+        overflow = self._count() - self.max_entries
+        if overflow > 0:
+            cur = self._conn.execute(
+                "DELETE FROM strategy_cache WHERE key IN ("
+                " SELECT key FROM strategy_cache ORDER BY accessed_at LIMIT ?)",
+                (overflow,),
+            )
+            self.evictions += cur.rowcount
+
+    async def aget(self, key: str) -> Optional[dict]:
+        return await asyncio.to_thread(self.get, key)
+
+    async def aset(self, key: str, value: dict) -> None:
+        await asyncio.to_thread(self.set, key, value)
+
+    async def aget_many(self, keys) -> dict:
+        # One thread hop for the lot
+        return await asyncio.to_thread(self.get_many, list(keys))
+
+    def _count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM strategy_cache").fetchone()[0]
+
+    def size(self) -> int:
+        # stats() runs in a thread (/health, /metrics): the connection is only ever used under the lock
+        with self._lock:
+            return self._count()
+
+
+class NullCache(MemoryCache):
+    """Caching disabled: every lookup is a miss."""
+
+    backend = "off"
+
+    def get(self, key: str) -> Optional[dict]:
+        self.misses += 1
+        return None
+
+    def set(self, key: str, value: dict) -> None:
+        pass
+
+
+def build_cache():
+    # Workers sharing state must share the cache too, or they can't see each other's answers
+    shared = STATE_BACKEND == "sqlite"
+    backend = os.environ.get("STRATEGY_CACHE_BACKEND", "sqlite" if shared else "memory").lower()
+    ttl = float(os.environ.get("STRATEGY_CACHE_TTL", "3600"))
+    size = int(os.environ.get("STRATEGY_CACHE_SIZE", "1024"))
+
+    if backend == "sqlite":
+        path = os.environ.get("STRATEGY_CACHE_PATH", STATE_PATH if shared else "strategy_cache.db")
+        return SQLiteCache(path, max_entries=size, ttl_seconds=ttl)
+    if backend == "off":
+        return NullCache(max_entries=0, ttl_seconds=0)
+    return MemoryCache(max_entries=size, ttl_seconds=ttl)
+
+
+strategy_cache = build_cache()
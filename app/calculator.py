@@ -0,0 +1,104 @@
+import numpy as np
+from typing import Dict, Optional, Sequence
+from app.core import Household, Transition, RISK_MULTIPLIERS, NO_BURN_RUNWAY, evaluate, risk_multiplier
+from app.simulation import simulate_runway
+
+# Default scenario grid for run_sweep (22 x 3 x 5 x 9 = 2,970 scenarios)
+SWEEP_MONTHS = range(3, 25)
+SWEEP_RISKS = ('low', 'medium', 'high')
+SWEEP_CUTS = (0.0, 0.25, 0.5, 0.75, 1.0)
+SWEEP_EDUCATION_COSTS = tuple(range(0, 20_001, 2_500))
+
+# --- CORE LOGIC (shared by the Streamlit apps) ---
+# The profile types and the math live in app/core.py; these names are kept
+# for the Streamlit apps
+FinancialProfile = Household
+TransitionPlan = Transition
+
+
+class CareerPivotCalculator:
+    RISK_MULTIPLIERS = RISK_MULTIPLIERS
+
+    def __init__(self, profile: FinancialProfile, plan: TransitionPlan):
+        self.profile = profile
+        self.plan = plan
+
+    def calculate_burn_rates(self) -> Dict[str, float]:
+        numbers = evaluate(self.profile, self.plan)
+        return {"comfort": numbers.comfort_burn_rate, "lean": numbers.burn_rate}
+
+    def run_simulation(self) -> Dict:
+        numbers = evaluate(self.profile, self.plan)
+        return {
+            "metrics": {
+                "burn_lean": numbers.burn_rate,
+                "required_capital": numbers.required_capital,
+                "current_assets": numbers.liquid_assets,
+                "gap": numbers.gap,
+                "runway": numbers.runway_months,
+                "min_balance": numbers.min_balance,
+                "min_balance_month": numbers.min_balance_month,
+                "break_even_month": numbers.break_even_month
+            },
+            "burn_data": {"comfort": numbers.comfort_burn_rate, "lean": numbers.burn_rate} # Passing this specifically for the chart
+        }
+
+    def run_sweep(self, months: Sequence[int] = SWEEP_MONTHS, risks: Sequence[str] = SWEEP_RISKS,
+                  discretionary_cuts: Sequence[float] = SWEEP_CUTS,
+                  education_costs: Sequence[float] = SWEEP_EDUCATION_COSTS) -> Dict:
+        """
+        run_simulation over the whole grid months x risks x cuts x costs in one
+        broadcast. A cut is the share of discretionary spending dropped during
+        the transition (1.0 = the lean burn run_simulation uses). "gap",
+        "required_capital" and "runway" are indexed [month, risk, cut, cost].
+        """
+        months = np.asarray(months, dtype=float)
+        cuts = np.asarray(discretionary_cuts, dtype=float)
+        costs = np.asarray(education_costs, dtype=float)
+        multipliers = np.array([risk_multiplier(r) for r in risks])
+
+        income = self.profile.spouse_net_income + self.profile.passive_income
+        outflow = (self.profile.fixed_expenses + self.profile.variable_expenses
+                   + (1 - cuts) * self.profile.discretionary_expenses)
+        burn = np.maximum(0, outflow - income)
+        liquid_assets = self.profile.cash_savings + self.profile.brokerage_taxable
+
+        # (month, 1, cut, 1) + (1, 1, 1, cost), then scaled per risk tier
+        monthly = (burn[None, :] + self.plan.health_insurance_gap) * months[:, None]
+        base_cost = monthly[:, None, :, None] + costs[None, None, None, :]
+        required_capital = (base_cost * multipliers[None, :, None, None]
+                            + (burn * self.plan.emergency_fund_months)[None, None, :, None])
+        shape = required_capital.shape
+
+        runway = np.full(len(burn), NO_BURN_RUNWAY)
+        np.divide(liquid_assets, burn, out=runway, where=burn > 0)
+
+        return {
+            "months": months.astype(int),
+            "risks": tuple(risks),
+            "discretionary_cuts": cuts,
+            "education_costs": costs,
+            "required_capital": required_capital,
+            "gap": required_capital - liquid_assets,
+            # Runway only depends on the cut; broadcast (no copy) to the grid's shape
+            "runway": np.broadcast_to(runway[None, None, :, None], shape),
+            "burn": burn,
+        }
+
+    def run_monte_carlo(self, n_paths: int = 100_000, horizon_months: Optional[int] = None,
+                        seed: Optional[int] = None) -> Dict:
+        """Stochastic version of run_simulation (see app.simulation)."""
+        return simulate_runway(
+            cash=self.profile.cash_savings,
+            brokerage=self.profile.brokerage_taxable,
+            spouse_income=self.profile.spouse_net_income,
+            passive_income=self.profile.passive_income,
+            lean_expenses=self.profile.fixed_expenses + self.profile.variable_expenses,
+            upskilling_cost=self.plan.upskilling_cost,
+            insurance_gap=self.plan.health_insurance_gap,
+            estimated_months=self.plan.estimated_months,
+            risk_tolerance=self.profile.risk_tolerance,
+            n_paths=n_paths,
+            horizon_months=horizon_months,
+            seed=seed
+        )
@@ -0,0 +1,221 @@
+import os
+import re
+import json
+import sqlite3
+import threading
+from functools import lru_cache
+from typing import Iterable, List, NamedTuple, Optional, Sequence, Tuple
+from app.models import LearningResource
+from app.metrics import registry
+
+# --- LEARNING-RESOURCE CATALOG ---
+# Claude used to invent 2 "real, low-cost" resources per answer: names, prices
+# and links written out token by token, sometimes made up. The resources now
+# come from a curated catalog, loaded once per process into SQLite and indexed
+# by target role, cost band and format. Each prompt lists a short shortlist
+# that fits the person's budget (derived from the capital gap) and Claude only
+# answers with the IDs it picks, which we map back to catalog entries. The
+# rules engine, the fallbacks and the offline UI fill theirs straight from the
+# index, so most answers never involve the model at all.
+#
+#   RESOURCE_CATALOG_PATH=app/data/learning_resources.json   (default) loaded into memory
+#   RESOURCE_CATALOG_PATH=/srv/resources.db                  prebuilt, opened read-only and
+#                                                            memory-mapped (shared by workers)
+#   python -m app.catalog resources.db                       build that file from the JSON
+DEFAULT_PATH = os.path.join(os.path.dirname(__file__), "data", "learning_resources.json")
+PATH = os.environ.get("RESOURCE_CATALOG_PATH", DEFAULT_PATH)
+# Entries offered to Claude per prompt, and picked per answer
+CANDIDATES = int(os.environ.get("RESOURCE_CANDIDATES", "6"))
+PICKS = 2
+# Share of the money left over after the plan (negative gap) that may go to learning;
+# with a capital gap only free resources are offered
+BUDGET_SHARE = float(os.environ.get("RESOURCE_BUDGET_SHARE", "0.1"))
+MMAP_BYTES = 64 * 1024 * 1024
+
+# Cost band -> highest price (USD to start; first month for subscriptions)
+COST_BANDS = (("free", 0.0), ("low", 100.0), ("mid", 1000.0), ("high", float("inf")))
+GENERAL_ROLE = "general"
+# Target role words -> catalog role, first match wins ("Data Engineer" is data, "UX Engineer" design)
+ROLE_KEYWORDS = (
+    ("security", {"security", "cybersecurity", "cyber", "soc", "pentester", "penetration"}),
+    ("data", {"data", "analyst", "analytics", "scientist", "ml", "ai", "bi", "machine"}),
+    ("design", {"design", "designer", "ux", "ui"}),
+    ("cloud", {"cloud", "devops", "sre", "sysadmin", "it", "infrastructure", "network", "support"}),
+    ("product", {"product", "pm", "project", "program", "scrum"}),
+    ("software", {"developer", "engineer", "software", "programmer", "frontend", "backend", "full",
+                  "stack", "web", "mobile", "ios", "android", "coder"}),
+)
+
+CATALOG_PICKS = registry.counter(
+    "careerpivot_catalog_picks_total", "Resource IDs in model answers: valid picks, unknown IDs, filled slots")
+
+
+class Resource(NamedTuple):
+    id: str
+    name: str
+    provider: str
+    format: str
+    cost_usd: float
+    cost: str        # Display price ("Free", "$49/month")
+    url: Optional[str]
+
+
+def band_of(cost_usd: float) -> str:
+    return next(band for band, ceiling in COST_BANDS if cost_usd <= ceiling)
+
+
+def bands_within(budget: float) -> Tuple[str, ...]:
+    """The cost bands with anything affordable on `budget`."""
+    floor = -1.0
+    bands = []
+    for band, ceiling in COST_BANDS:
+        if floor < budget:
+            bands.append(band)
+        floor = ceiling
+    return tuple(bands)
+
+
+@lru_cache(maxsize=1024)
+def role_for(target_role: Optional[str]) -> str:
+    """The catalog role for a free-text target role ("Senior Full Stack Developer" -> software)."""
+    words = set(re.findall(r"[a-z]+", (target_role or "").lower()))
+    return next((role for role, keywords in ROLE_KEYWORDS if words & keywords), GENERAL_ROLE)
+
+
+def budget_for(gap: float) -> float:
+    """Learning budget from the capital gap: a share of the surplus, nothing if short (whole dollars)."""
+    return float(int(max(0.0, -gap) * BUDGET_SHARE))
+
+
+def to_learning_resource(resource: Resource) -> LearningResource:
+    return LearningResource(name=resource.name, cost=resource.cost, url=resource.url)
+
+
+class ResourceCatalog:
+    def __init__(self, conn: sqlite3.Connection, source: str):
+        self.source = source
+        self._conn = conn
+        self._lock = threading.Lock()
+        rows = conn.execute(f"SELECT {', '.join(Resource._fields)} FROM resources ORDER BY rank").fetchall()
+        self._by_id = {row[0]: Resource._make(row) for row in rows}
+        self.roles = sorted(r[0] for r in conn.execute("SELECT DISTINCT role FROM resource_roles"))
+        # Budgets are whole dollars, so the same shortlists come back again and again
+        self.shortlist = lru_cache(maxsize=1024)(self._shortlist)
+
+    @classmethod
+    def from_json(cls, path: str) -> "ResourceCatalog":
+        with open(path, encoding="utf-8") as f:
+            entries = json.load(f)
+        conn = sqlite3.connect(":memory:", check_same_thread=False)
+        conn.executescript(
+            "CREATE TABLE resources ("
+            " id TEXT PRIMARY KEY, name TEXT NOT NULL, provider TEXT NOT NULL, format TEXT NOT NULL,"
+            " cost_usd REAL NOT NULL, cost TEXT NOT NULL, url TEXT, rank INTEGER NOT NULL);"
+            "CREATE TABLE resource_roles ("
+            " role TEXT NOT NULL, cost_band TEXT NOT NULL, format TEXT NOT NULL,"
+            " rank INTEGER NOT NULL, resource_id TEXT NOT NULL REFERENCES resources (id));"
+            "CREATE INDEX resource_roles_lookup ON resource_roles (role, cost_band, format, rank);"
+        )
+        with conn:
+            for rank, e in enumerate(entries):
+                conn.execute("INSERT INTO resources VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                             (e["id"], e["name"], e["provider"], e["format"], float(e["cost_usd"]),
+                              e["cost"], e.get("url"), rank))
+                conn.executemany("INSERT INTO resource_roles VALUES (?, ?, ?, ?, ?)",
+                                 [(role, band_of(e["cost_usd"]), e["format"], rank, e["id"])
+                                  for role in e["roles"]])
+        return cls(conn, path)
+
+    @classmethod
+    def from_db(cls, path: str) -> "ResourceCatalog":
+        # Read-only and memory-mapped: every worker reads the same pages from the OS cache
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        conn.execute(f"PRAGMA mmap_size={MMAP_BYTES}")
+        return cls(conn, path)
+
+    def save(self, path: str) -> None:
+        """Write the indexed catalog to a SQLite file (for RESOURCE_CATALOG_PATH)."""
+        target = sqlite3.connect(path)
+        with self._lock:
+            self._conn.backup(target)
+        target.close()
+
+    def _shortlist(self, role: str, budget: float, formats: Optional[Tuple[str, ...]] = None,
+                   limit: int = CANDIDATES) -> Tuple[Resource, ...]:
+        """
+        Up to `limit` resources for `role` costing at most `budget`: role-specific
+        ones first, cost bands taking turns (best free, best low-cost, ...).
+        """
+        bands = bands_within(budget)
+        sql = ("SELECT resource_id, MIN(role != ?) AS generic, MIN(resource_roles.rank) AS rank, cost_band"
+               " FROM resource_roles JOIN resources ON resources.id = resource_id"
+               f" WHERE role IN (?, ?) AND cost_band IN ({', '.join('?' * len(bands))}) AND cost_usd <= ?")
+        params = [role, role, GENERAL_ROLE, *bands, budget]
+        if formats:
+            sql += f" AND resource_roles.format IN ({', '.join('?' * len(formats))})"
+            params += formats
+        sql = (f"SELECT resource_id FROM ({sql} GROUP BY resource_id) ORDER BY generic,"
+               " ROW_NUMBER() OVER (PARTITION BY generic, cost_band ORDER BY rank), rank LIMIT ?")
+        params.append(limit)
+        with self._lock:
+            ids = self._conn.execute(sql, params).fetchall()
+        return tuple(self._by_id[row[0]] for row in ids)
+
+    def get(self, resource_id: str) -> Optional[Resource]:
+        return self._by_id.get(resource_id)
+
+    def pick(self, ids: Iterable[str], candidates: Sequence[Resource], count: int = PICKS) -> List[Resource]:
+        """
+        The model's picks that really are in `candidates` (in its order, no
+        repeats, at most `count`), topped up with the best remaining candidates.
+        """
+        offered = {c.id: c for c in candidates}
+        chosen = []
+        for resource_id in ids:
+            resource = offered.get(resource_id)
+            if resource is None:
+                CATALOG_PICKS.inc(outcome="unknown")
+            elif resource not in chosen and len(chosen) < count:
+                chosen.append(resource)
+        if chosen:
+            CATALOG_PICKS.inc(len(chosen), outcome="valid")
+        for resource in candidates:
+            if len(chosen) >= count:
+                break
+            if resource not in chosen:
+                chosen.append(resource)
+                CATALOG_PICKS.inc(outcome="filled")
+        return chosen
+
+    def recommend(self, target_role: Optional[str], gap: float, count: int = PICKS) -> List[LearningResource]:
+        """The top `count` resources straight from the index (no model involved)."""
+        return [to_learning_resource(r)
+                for r in self.shortlist(role_for(target_role), budget_for(gap))[:count]]
+
+    def stats(self) -> dict:
+        info = self.shortlist.cache_info()
+        return {"resources": len(self._by_id), "roles": len(self.roles),
+                "shortlist_hits": info.hits, "shortlist_misses": info.misses}
+
+
+@lru_cache(maxsize=1024)
+def prompt_lines(candidates: Tuple[Resource, ...]) -> str:
+    """The shortlist as the prompt shows it: 'id=name (cost format)' entries."""
+    return "; ".join(f"{r.id}={r.name} ({r.cost} {r.format})" for r in candidates)
+
+
+def build_catalog(path: str = PATH) -> ResourceCatalog:
+    if path.endswith(".json"):
+        return ResourceCatalog.from_json(path)
+    return ResourceCatalog.from_db(path)
+
+
+resource_catalog = build_catalog()
+
+
+if __name__ == "__main__":
+    import sys
+    out = sys.argv[1] if len(sys.argv) > 1 else "learning_resources.db"
+    catalog = ResourceCatalog.from_json(DEFAULT_PATH)
+    catalog.save(out)
+    print(f"Wrote {catalog.stats()['resources']} resources to {out}")
@@ -0,0 +1,67 @@
+import os
+import asyncio
+import threading
+
+# --- SHARED ANTHROPIC CLIENTS (Lazy, Pooled) ---
+# One client per worker process, reused by every request so we keep TLS
+# connections warm instead of re-handshaking per call. The SDK itself is only
+# imported when the first strategy is requested: importing it costs over a
+# second, which /health and cold starts shouldn't pay, and it happens in a
+# thread so the requests already in flight on the event loop don't stall.
+MAX_CONNECTIONS = int(os.environ.get("ANTHROPIC_MAX_CONNECTIONS", "200"))
+MAX_KEEPALIVE_CONNECTIONS = int(os.environ.get("ANTHROPIC_MAX_KEEPALIVE", "50"))
+# Load the SDK in a background thread right after startup instead of on the first request
+PREWARM = os.environ.get("ANTHROPIC_PREWARM", "0") == "1"
+
+_async_client = None
+_client = None
+_lock = threading.Lock()
+
+
+def create_async_client():
+    """Build the shared anthropic.AsyncAnthropic client (idempotent)."""
+    global _async_client
+    with _lock:
+        if _async_client is None:
+            import httpx
+            import anthropic
+            _async_client = anthropic.AsyncAnthropic(
+                api_key=os.environ.get("ANTHROPIC_API_KEY"),
+                http_client=anthropic.DefaultAsyncHttpxClient(
+                    limits=httpx.Limits(
+                        max_connections=MAX_CONNECTIONS,
+                        max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                    )
+                ),
+            )
+    return _async_client
+
+
+async def get_async_client():
+    """Return the shared async client, creating it (off the event loop) on first use."""
+    if _async_client is not None:
+        return _async_client
+    return await asyncio.to_thread(create_async_client)
+
+
+def get_client():
+    """Blocking anthropic.Anthropic client for scripts and Streamlit, created once on first use."""
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                import anthropic
+                _client = anthropic.Anthropic(api_key=os.environ.get("ANTHROPIC_API_KEY"))
+    return _client
+
+
+def sdk_loaded() -> bool:
+    return _async_client is not None or _client is not None
+
+
+async def close_async_client() -> None:
+    """Close the pooled connections on app shutdown."""
+    global _async_client
+    if _async_client is not None:
+        await _async_client.close()
+        _async_client = None
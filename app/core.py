@@ -0,0 +1,160 @@
+import numpy as np
+from functools import lru_cache
+from typing import Dict, NamedTuple, Optional
+from app.ledger import run_ledger, NEVER
+
+# --- CORE ENGINE (one financial model for every frontend) ---
+# The Streamlit calculators and the API used to carry their own profile types
+# and their own math. Both now describe a person with a Household and a
+# Transition: immutable, hashable values that are cheap to build and safe to
+# memoize. They are NamedTuples (__slots__ = (), hashing and equality in C):
+# a frozen dataclass costs ~10x more to construct, which is most of the math.
+# Pydantic models stay at the HTTP edge and are converted once
+# (FinancialBridge.to_core); nothing in here validates or builds dicts.
+#
+#   burn      = max(0, fixed + variable - income)      (lean: no discretionary)
+#   required  = (burn + insurance gap) * months + education, times the risk
+#               multiplier, plus burn * emergency fund months
+#   gap       = required - (cash + brokerage)
+#
+# The API's old run_math is the case with only fixed expenses and an emergency
+# fund; CareerPivotCalculator's is the case with a risk tolerance and no fund.
+# The month-by-month ledger (app/ledger.py) adds the minimum balance and the
+# break-even month (NEVER = not within its horizon).
+RISK_MULTIPLIERS = {'low': 1.5, 'medium': 1.25, 'high': 1.1}
+DEFAULT_RISK_MULTIPLIER = 1.25
+# Reported runway when nothing is burned
+NO_BURN_RUNWAY = 999.0
+MEMO_SIZE = 4096
+
+
+class Household(NamedTuple):
+    cash_savings: float
+    brokerage_taxable: float
+    spouse_net_income: float
+    passive_income: float
+    fixed_expenses: float
+    variable_expenses: float
+    discretionary_expenses: float
+    risk_tolerance: Optional[str] = None  # None: no risk multiplier
+    current_salary: float = 0.0
+    new_salary: Optional[float] = None
+
+
+class Transition(NamedTuple):
+    target_role: str
+    upskilling_cost: float
+    estimated_months: int
+    health_insurance_gap: float
+    emergency_fund_months: int = 0
+    tuition_installments: int = 1
+
+
+class Numbers(NamedTuple):
+    burn_rate: float           # Lean: discretionary spending cut
+    comfort_burn_rate: float   # Discretionary spending kept
+    required_capital: float
+    liquid_assets: float
+    gap: float
+    runway_months: float
+    is_ready: bool
+    min_balance: float
+    min_balance_month: int
+    break_even_month: int
+
+
+def risk_multiplier(risk_tolerance: Optional[str]) -> float:
+    if risk_tolerance is None:
+        return 1.0
+    return RISK_MULTIPLIERS.get(risk_tolerance, DEFAULT_RISK_MULTIPLIER)
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def evaluate(household: Household, transition: Transition) -> Numbers:
+    """The deterministic numbers for one plan, memoized by value."""
+    h, t = household, transition
+    income = h.spouse_net_income + h.passive_income
+    lean = h.fixed_expenses + h.variable_expenses
+    burn = max(0.0, lean - income)
+    comfort = max(0.0, lean + h.discretionary_expenses - income)
+
+    base = (burn + t.health_insurance_gap) * t.estimated_months + t.upskilling_cost
+    required = base * risk_multiplier(h.risk_tolerance) + burn * t.emergency_fund_months
+    liquid = h.cash_savings + h.brokerage_taxable
+    gap = required - liquid
+    runway = liquid / burn if burn > 0 else NO_BURN_RUNWAY
+
+    # One-row ledger; zero fields are left out so their events cost nothing
+    ledger = run_ledger({name: np.array([float(value)]) for name, value in (
+        ("cash_savings", h.cash_savings), ("brokerage_taxable", h.brokerage_taxable),
+        ("spouse_net_income", h.spouse_net_income), ("passive_income", h.passive_income),
+        ("fixed_expenses", h.fixed_expenses), ("variable_expenses", h.variable_expenses),
+        ("discretionary_expenses", h.discretionary_expenses), ("new_salary", h.new_salary),
+        ("upskilling_cost", t.upskilling_cost), ("estimated_months", t.estimated_months),
+        ("health_insurance_gap", t.health_insurance_gap), ("tuition_installments", t.tuition_installments),
+    ) if value or name == "estimated_months"})
+    return Numbers(burn, comfort, required, liquid, gap, runway, gap <= 0, float(ledger["min_balance"][0]),
+                   int(ledger["min_balance_month"][0]), int(ledger["break_even_month"][0]))
+
+
+def evaluate_many(columns: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """
+    evaluate() for many rows: `columns` holds one array per Household or
+    Transition field that is set (absent numeric fields count as 0, and only
+    the present ones cost an array operation), plus an optional
+    "risk_multiplier" column. Returns one array per Numbers field.
+    """
+    def total(*names):
+        present = [columns[name] for name in names if name in columns]
+        return sum(present[1:], present[0]) if present else None
+
+    lean = total("fixed_expenses", "variable_expenses")
+    income = total("spouse_net_income", "passive_income")
+    # Expenses are never negative, so only income can push the burn below 0
+    if income is not None:
+        lean = lean - income
+        burn = np.maximum(0.0, lean)
+    else:
+        burn = lean
+    discretionary = columns.get("discretionary_expenses")
+    comfort = burn if discretionary is None else np.maximum(0.0, lean + discretionary)
+
+    monthly = burn if "health_insurance_gap" not in columns else burn + columns["health_insurance_gap"]
+    required = monthly * columns["estimated_months"]
+    if "upskilling_cost" in columns:
+        required = required + columns["upskilling_cost"]
+    if "risk_multiplier" in columns:
+        required = required * columns["risk_multiplier"]
+    if "emergency_fund_months" in columns:
+        required = required + burn * columns["emergency_fund_months"]
+    liquid = total("cash_savings", "brokerage_taxable")
+    gap = required - liquid
+
+    runway = np.full(len(burn), NO_BURN_RUNWAY)
+    np.divide(liquid, burn, out=runway, where=burn > 0)
+    ledger = run_ledger(columns)
+
+    return {
+        "burn_rate": burn,
+        "comfort_burn_rate": comfort,
+        "required_capital": required,
+        "liquid_assets": liquid,
+        "gap": gap,
+        "runway_months": runway,
+        "is_ready": gap <= 0,
+        "min_balance": ledger["min_balance"],
+        "min_balance_month": ledger["min_balance_month"],
+        "break_even_month": ledger["break_even_month"],
+    }
+
+
+def rows(numbers: Dict[str, np.ndarray]) -> list:
+    """Split evaluate_many's columns back into Numbers values."""
+    columns = [numbers[name].tolist() for name in Numbers._fields]
+    return list(map(Numbers._make, zip(*columns)))
+
+
+def memo_stats() -> Dict[str, int]:
+    info = evaluate.cache_info()
+    return {"hits": info.hits, "misses": info.misses, "size": info.currsize}
+
@@ -0,0 +1,238 @@
+import io
+import os
+import csv
+import json
+import time
+import asyncio
+import logging
+import threading
+from typing import AsyncIterator, List, Optional, Sequence, Union
+from app.models import FinancialProfile, FinancialProfileColumns, TransitionPlan
+from app.state import connect, WORKER_ID
+from app.metrics import registry, log_event
+
+# --- ANALYSIS HISTORY (append-only, for analytics) ---
+# Every profile /analyze, /analyze/stream and /analyze/batch sees is kept with
+# the TransitionPlan we answered and its strategy metadata (verdict, where the
+# strategy came from: rules, cache, claude or fallback, and the model), so cohort
+# statistics come from one export instead of re-running the API. Requests only
+# put their (already computed) objects on a queue; a background task turns them
+# into rows and writes them in batches, one SQLite transaction each, off the
+# event loop. Deferred strategies add a "job" row with the finished plan once
+# their job is done (same strategy_job_id). Several workers (python -m app.serve)
+# append to the same file; WAL lets exports read while they write. The file is
+# opened when the app starts (lifespan), never on import.
+#
+# The rows are people's whole financial situation, so keeping them is opt-in,
+# and GET /history/export only answers a bearer HISTORY_EXPORT_TOKEN (no token
+# set: no export). It streams the table in id order, CHUNK_SIZE rows per query,
+# as NDJSON or CSV: millions of rows never sit in memory at once. The worker
+# (hostname:pid) is kept for debugging but never exported.
+#   HISTORY_BACKEND=off      (default) keep nothing
+#   HISTORY_BACKEND=sqlite   append to HISTORY_PATH
+BACKEND = os.environ.get("HISTORY_BACKEND", "off").lower()
+PATH = os.environ.get("HISTORY_PATH", "careerpivot_history.db")
+EXPORT_TOKEN = os.environ.get("HISTORY_EXPORT_TOKEN") or None
+# Rows written per transaction (at least: a batch request's rows go in together)
+BATCH_SIZE = int(os.environ.get("HISTORY_BATCH_SIZE", "500"))
+# A write that found less than a full batch waits this long for the next one to build up
+FLUSH_SECONDS = float(os.environ.get("HISTORY_FLUSH_SECONDS", "0.5"))
+# Rows waiting to be written; requests beyond this are dropped (counted) rather than held in memory
+MAX_PENDING = int(os.environ.get("HISTORY_MAX_PENDING", "100000"))
+CHUNK_SIZE = 1000
+
+COLUMNS = ("id", "created_at", "endpoint", "tier", "worker", "target_role", "verdict", "strategy_source",
+           "model", "capital_gap", "runway_months", "is_ready", "strategy_job_id", "profile", "plan")
+# Added after the first release: ALTERed into existing files
+ADDED_COLUMNS = ("strategy_source", "model")
+EXPORT_COLUMNS = tuple(c for c in COLUMNS if c != "worker")
+INSERT_SQL = f"INSERT INTO analyses ({', '.join(COLUMNS[1:])}) VALUES ({', '.join('?' * (len(COLUMNS) - 1))})"
+
+HISTORY_ROWS = registry.counter(
+    "careerpivot_history_rows_total", "Analyses appended to the history store, or dropped")
+
+Profiles = Union[Sequence[FinancialProfile], FinancialProfileColumns]
+
+
+def profile_rows(profiles: Profiles) -> List[dict]:
+    """One input dict per profile (columnar payloads are split into rows)."""
+    if isinstance(profiles, FinancialProfileColumns):
+        fields = profiles.model_dump(exclude_none=True)
+        return [dict(zip(fields, values)) for values in zip(*fields.values())]
+    return [p.model_dump() for p in profiles]
+
+
+class AnalysisHistory:
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self.backend = "sqlite" if path else "off"
+        self.written = 0
+        self.dropped = 0
+        self.pending = 0  # Rows queued, not yet written
+        self._queue = None
+        self._task = None
+        self._conn = None
+        self._reader = None
+        self._lock = threading.Lock()
+        self._read_lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.path is not None
+
+    def _open(self) -> None:
+        self._conn = connect(self.path)
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS analyses ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT, created_at REAL NOT NULL, endpoint TEXT NOT NULL,"
+            " tier TEXT, worker TEXT NOT NULL, target_role TEXT, verdict TEXT, strategy_source TEXT,"
+            " model TEXT, capital_gap REAL, runway_months REAL, is_ready INTEGER, strategy_job_id TEXT,"
+            " profile TEXT NOT NULL, plan TEXT NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS analyses_created ON analyses (created_at);"
+        )
+        existing = {row[1] for row in self._conn.execute("PRAGMA table_info(analyses)")}
+        for column in ADDED_COLUMNS:
+            if column not in existing:
+                self._conn.execute(f"ALTER TABLE analyses ADD COLUMN {column} TEXT")
+        # Exports read on their own connection, so they never wait behind the writer
+        self._reader = connect(self.path)
+
+    async def start(self) -> None:
+        if self.enabled:
+            await asyncio.to_thread(self._open)
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._writer())
+
+    async def stop(self, timeout: float) -> None:
+        """Write what's still queued (up to `timeout` seconds), then stop the writer."""
+        if self._task is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        self._conn.close()
+        self._reader.close()
+
+    def record(self, endpoint: str, profiles: Profiles, plans: Sequence[TransitionPlan],
+               tier: Optional[str] = None) -> None:
+        """Queue analyses for the writer; never blocks or raises on the request path."""
+        if self._task is None:
+            return
+        if self.pending + len(plans) > MAX_PENDING:
+            self.dropped += len(plans)
+            HISTORY_ROWS.inc(len(plans), outcome="dropped")
+            return
+        self.pending += len(plans)
+        self._queue.put_nowait((time.time(), endpoint, tier, profiles, plans))
+
+    async def _writer(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            rows = len(batch[0][4])
+            while rows < BATCH_SIZE and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                rows += len(batch[-1][4])
+            try:
+                await asyncio.to_thread(self._write, batch)
+            except Exception as e:
+                self.dropped += rows
+                HISTORY_ROWS.inc(rows, outcome="dropped")
+                log_event("history_write_failed", logging.WARNING, error_type=type(e).__name__, error=str(e))
+            finally:
+                self.pending -= rows
+                for _ in batch:
+                    self._queue.task_done()
+            if rows < BATCH_SIZE:
+                await asyncio.sleep(FLUSH_SECONDS)
+
+    def _write(self, batch: list) -> None:
+        # Runs in a thread: serializing the models is part of the work kept off the event loop
+        rows = []
+        for created_at, endpoint, tier, profiles, plans in batch:
+            for profile, plan in zip(profile_rows(profiles), plans):
+                strategy = plan.strategy
+                verdict, source, model = ((strategy.verdict, strategy.source, strategy.model)
+                                          if strategy is not None else (None, None, None))
+                rows.append((created_at, endpoint, tier, WORKER_ID, profile.get("target_role"), verdict, source,
+                             model, plan.capital_gap, plan.total_runway_months, int(plan.is_financially_ready),
+                             plan.strategy_job_id, json.dumps(profile), plan.model_dump_json()))
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(INSERT_SQL, rows)
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+        self.written += len(rows)
+        HISTORY_ROWS.inc(len(rows), outcome="written")
+
+    # --- Export ---
+    def _read_chunk(self, after_id: int, last_id: int, since: Optional[float], until: Optional[float],
+                    endpoint: Optional[str], limit: int) -> list:
+        sql = f"SELECT {', '.join(EXPORT_COLUMNS)} FROM analyses WHERE id > ? AND id <= ?"
+        params = [after_id, last_id]
+        for clause, value in (("created_at >= ?", since), ("created_at < ?", until), ("endpoint = ?", endpoint)):
+            if value is not None:
+                sql += f" AND {clause}"
+                params.append(value)
+        sql += " ORDER BY id LIMIT ?"
+        params.append(limit)
+        with self._read_lock:
+            return self._reader.execute(sql, params).fetchall()
+
+    def _last_id(self) -> int:
+        with self._read_lock:
+            return self._reader.execute("SELECT COALESCE(MAX(id), 0) FROM analyses").fetchone()[0]
+
+    async def export(self, fmt: str = "ndjson", since: Optional[float] = None, until: Optional[float] = None,
+                     endpoint: Optional[str] = None, chunk_size: int = CHUNK_SIZE) -> AsyncIterator[str]:
+        """
+        The stored analyses in id order, one text chunk per `chunk_size` rows.
+        Rows appended after the export starts are left out, so it always ends.
+        """
+        last_id = await asyncio.to_thread(self._last_id)
+        if fmt == "csv":
+            yield ",".join(EXPORT_COLUMNS) + "\r\n"
+        after_id = 0
+        while True:
+            rows = await asyncio.to_thread(self._read_chunk, after_id, last_id, since, until, endpoint, chunk_size)
+            if not rows:
+                return
+            yield format_csv(rows) if fmt == "csv" else format_ndjson(rows)
+            after_id = rows[-1][0]
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.backend,
+            "pending": self.pending,
+            "written": self.written,
+            "dropped": self.dropped,
+        }
+
+
+def format_ndjson(rows: list) -> str:
+    # profile and plan are stored as JSON already: spliced in, not decoded and re-encoded
+    lines = []
+    for row in rows:
+        head = dict(zip(EXPORT_COLUMNS[:-2], row[:-2]))
+        head["is_ready"] = bool(head["is_ready"])
+        lines.append(f'{json.dumps(head)[:-1]}, "profile": {row[-2]}, "plan": {row[-1]}}}\n')
+    return "".join(lines)
+
+
+def format_csv(rows: list) -> str:
+    out = io.StringIO()
+    csv.writer(out).writerows(rows)
+    return out.getvalue()
+
+
+def build_history() -> AnalysisHistory:
+    return AnalysisHistory(PATH if BACKEND == "sqlite" else None)
+
+
+analysis_history = build_history()
@@ -0,0 +1,160 @@
+import os
+import uuid
+import asyncio
+from collections import OrderedDict
+from typing import Optional
+from app.models import FinancialProfile, StrategyJob
+from app.core import Numbers
+from app.logic import FinancialBridge
+from app.state import shared_state
+from app.history import analysis_history
+from app.admission import admission, Overloaded, ADMISSIONS
+
+# --- DEFERRED AI STRATEGY QUEUE ---
+# /analyze?defer=true answers with the numbers straight away and hands the
+# slow Claude call to this queue. Clients poll /strategy/{job_id} or listen on
+# /strategy/{job_id}/events until the job is done. With a shared state
+# backend every job update is written through (in a thread, off the event
+# loop), so any worker can answer the poll.
+# The queue is bounded: when it's full /analyze?defer=true answers 429 + Retry-After.
+WORKERS = int(os.environ.get("STRATEGY_WORKERS", "8"))
+MAX_JOBS = int(os.environ.get("STRATEGY_MAX_JOBS", "10000"))
+MAX_QUEUE = int(os.environ.get("STRATEGY_MAX_QUEUE", "500"))
+# What a job takes before we've timed any (for Retry-After)
+JOB_SECONDS = 2.0
+# How often a worker polls the shared state for a job running on another worker
+POLL_SECONDS = 0.25
+
+
+class StrategyJobQueue:
+    def __init__(self, workers: int = WORKERS, max_jobs: int = MAX_JOBS, max_queue: int = MAX_QUEUE):
+        self.workers = workers
+        self.max_jobs = max_jobs
+        self.max_queue = max_queue
+        self.job_seconds = JOB_SECONDS  # Moving average of finished jobs
+        self._jobs = OrderedDict()
+        self._done_events = {}
+        self._queue = None
+        self._tasks = []
+
+    async def start(self) -> None:
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def drain(self, timeout: float) -> None:
+        """On shutdown: give queued and running jobs `timeout` seconds to finish."""
+        if self._queue is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        # Whatever didn't drain is lost with this process: don't leave pollers waiting
+        for job_id, job in list(self._jobs.items()):
+            if job.status in ("pending", "running"):
+                await self._set(StrategyJob(job_id=job_id, status="failed", error="Worker shut down"))
+
+    def retry_after(self) -> float:
+        """Rough time for the workers to get through the queue."""
+        return (self._queue.qsize() + 1) * self.job_seconds / self.workers
+
+    def check_capacity(self, tier: Optional[str] = None) -> None:
+        """Raise Overloaded now if a job submitted now would be shed (queue or upstream full)."""
+        admission.check_capacity(tier)
+        if self._queue.full():
+            ADMISSIONS.inc(tier=tier or "unknown", outcome="shed")
+            raise Overloaded(self.retry_after(), "strategy queue full")
+
+    async def submit(self, profile: FinancialProfile, numbers: Numbers, tier: Optional[str] = None) -> str:
+        """Queue the strategy for a worker; raises Overloaded (before storing anything) when full."""
+        self.check_capacity(tier)
+        job_id = uuid.uuid4().hex
+        self._done_events[job_id] = asyncio.Event()
+        await self._set(StrategyJob(job_id=job_id, status="pending"))
+        await self._prune()
+        try:
+            self._queue.put_nowait((job_id, profile, numbers, tier))
+        except asyncio.QueueFull:
+            # Filled up by other requests while the job was being stored
+            self._done_events.pop(job_id).set()
+            await self._set(StrategyJob(job_id=job_id, status="failed", error="Strategy queue full"))
+            raise Overloaded(self.retry_after(), "strategy queue full")
+        return job_id
+
+    async def get(self, job_id: str) -> Optional[StrategyJob]:
+        job = self._jobs.get(job_id)
+        if job is None and shared_state is not None:
+            stored = await asyncio.to_thread(shared_state.load_job, job_id)
+            job = StrategyJob(**stored) if stored else None
+        return job
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[StrategyJob]:
+        """Block until the job finishes (or timeout), then return its state."""
+        event = self._done_events.get(job_id)
+        if event is not None:
+            try:
+                await asyncio.wait_for(event.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        elif job_id not in self._jobs and shared_state is not None:
+            # Running on another worker
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + timeout
+            while loop.time() < deadline:
+                job = await self.get(job_id)
+                if job is None or job.status in ("done", "failed"):
+                    return job
+                await asyncio.sleep(POLL_SECONDS)
+        return await self.get(job_id)
+
+    async def _set(self, job: StrategyJob) -> None:
+        self._jobs[job.job_id] = job
+        if shared_state is not None:
+            await asyncio.to_thread(shared_state.save_job, job.job_id, job.status, job.model_dump())
+
+    async def _worker(self) -> None:
+        while True:
+            job_id, profile, numbers, tier = await self._queue.get()
+            await self._set(StrategyJob(job_id=job_id, status="running"))
+            loop = asyncio.get_running_loop()
+            started = loop.time()
+            try:
+                strategy = await FinancialBridge.generate_strategy(profile, numbers, tier=tier)
+                self.job_seconds = 0.8 * self.job_seconds + 0.2 * (loop.time() - started)
+                await self._set(StrategyJob(job_id=job_id, status="done", strategy=strategy))
+                plan = FinancialBridge.build_plan(numbers, strategy)
+                plan.strategy_job_id = job_id
+                analysis_history.record("job", [profile], [plan], tier)
+            except Exception as e:
+                await self._set(StrategyJob(job_id=job_id, status="failed", error=str(e)))
+            finally:
+                self._done_events.pop(job_id, asyncio.Event()).set()
+                self._queue.task_done()
+
+    async def _prune(self) -> None:
+        # Forget the oldest finished jobs once we hold too many
+        while len(self._jobs) > self.max_jobs:
+            oldest = next(iter(self._jobs))
+            if self._jobs[oldest].status in ("pending", "running"):
+                break
+            del self._jobs[oldest]
+        if shared_state is not None and len(self._jobs) % 100 == 0:
+            await asyncio.to_thread(shared_state.prune_jobs, self.max_jobs)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "max_queue": self.max_queue,
+            "job_seconds": round(self.job_seconds, 3),
+            "tracked_jobs": len(self._jobs),
+        }
+
+
+strategy_jobs = StrategyJobQueue()
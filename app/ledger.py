@@ -0,0 +1,125 @@
+import numpy as np
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Optional
+
+# --- CASH-FLOW LEDGER (month by month) ---
+# Replaces "constant burn, tuition on day 1" with the events of a real
+# transition, for many profiles at once:
+#   * tuition paid in equal installments from quit day (month 0)
+#   * COBRA at the insurance gap until it expires, then a marketplace plan
+#   * the new salary starting after the hire month, ramping up to full pay
+#     (no new salary: nothing is simulated past the hire month, the balances
+#     stay where they were, so there is no break-even and no made-up losses)
+#   * spending back to normal (discretionary included) once hired
+#   * cash spent first, then brokerage sold, losing the capital-gains drag
+# Arrays are (months, profiles) and there is no Python loop: the sales are the
+# running maximum of cumulative spending above the cash on hand, so one call
+# costs a few dozen array operations whatever the horizon or batch size.
+# Absent columns skip their events entirely (evaluate() leaves out zero fields),
+# which keeps the single-profile call in /analyze to a few tens of microseconds.
+
+
+@dataclass(frozen=True)
+class LedgerAssumptions:
+    horizon_months: int = 36
+    cobra_months: int = 18                 # COBRA continuation limit
+    post_cobra_premium_factor: float = 1.15  # Marketplace premium vs. the COBRA premium
+    salary_ramp_months: int = 3            # Months until the first full paycheck
+    salary_tax_rate: float = 0.28          # Gross -> take-home pay
+    capital_gains_drag: float = 0.075      # Share of each brokerage sale lost to tax
+
+
+# Month sentinel: never happens within the horizon
+NEVER = -1
+
+
+@lru_cache(maxsize=16)
+def month_grid(assumptions: LedgerAssumptions):
+    """Month index (month 0 = quit day), 'after quit day' mask and premium factor, as columns."""
+    t = np.arange(assumptions.horizon_months + 1, dtype=float)[:, None]
+    premium_factor = np.where(t <= assumptions.cobra_months, 1.0, assumptions.post_cobra_premium_factor)
+    return t, (t >= 1).astype(float), premium_factor
+
+
+def _add(total: Optional[np.ndarray], term: np.ndarray) -> np.ndarray:
+    return term if total is None else total + term
+
+
+def run_ledger(columns: Dict[str, np.ndarray], assumptions: LedgerAssumptions = LedgerAssumptions(),
+               keep_balances: bool = False) -> Dict[str, np.ndarray]:
+    """
+    Simulate each row of `columns` (app/core.py column names; absent ones are
+    0, tuition_installments defaults to 1) month by month. Returns per-row
+    min_balance, min_balance_month, break_even_month (first month after the
+    hire with the balance back at its starting level, NEVER if not within the
+    horizon) and tax_paid; plus the (months + 1, rows) "balances" if asked.
+    """
+    a = assumptions
+    t, after_quit, premium_factor = month_grid(a)
+    col = lambda name: columns.get(name)
+    hire = col("estimated_months")
+    n = len(hire)
+    hired = t > hire
+
+    # --- 1. THE EVENTS (net outflow per month) ---
+    monthly = None  # Same amount every month after quit day
+    for name in ("fixed_expenses", "variable_expenses"):
+        if col(name) is not None:
+            monthly = _add(monthly, col(name))
+    for name in ("spouse_net_income", "passive_income"):
+        if col(name) is not None:
+            monthly = _add(monthly, -col(name))
+    outflow = after_quit * (monthly if monthly is not None else 0.0)
+
+    if col("discretionary_expenses") is not None:
+        outflow = outflow + hired * col("discretionary_expenses")
+
+    if col("upskilling_cost") is not None:
+        installments = np.maximum(columns.get("tuition_installments", 1.0), 1.0)
+        outflow = outflow + (t < installments) * (col("upskilling_cost") / installments)
+
+    if col("health_insurance_gap") is not None:
+        # COBRA, then the marketplace plan, until the employer covers it
+        outflow = outflow + (after_quit * ~hired) * (premium_factor * col("health_insurance_gap"))
+
+    salary = col("new_salary")
+    if salary is None:
+        # Nothing known about life after the hire: the simulation stops at the hire month
+        outflow = outflow * ~hired
+    else:
+        take_home = salary * ((1 - a.salary_tax_rate) / 12)
+        ramp = np.clip((t - hire) * (1 / max(a.salary_ramp_months, 1)), 0.0, 1.0)
+        # Rows without a salary (0) stop at the hire month too
+        outflow = np.where(hired & (salary <= 0), 0.0, outflow - ramp * take_home)
+
+    # --- 2. THE BALANCES ---
+    spent = np.cumsum(np.broadcast_to(outflow, (len(t), n)), axis=0)
+    cash0 = col("cash_savings") if col("cash_savings") is not None else np.zeros(n)
+    brokerage0 = col("brokerage_taxable")
+    keep = 1 - a.capital_gains_drag
+    if brokerage0 is None:
+        sold = np.zeros(n)
+        start = cash0
+        balances = cash0 - spent
+    else:
+        # Brokerage is sold only when cash would go negative, and only while there is any left
+        sold = np.minimum(np.maximum(np.maximum.accumulate(spent, axis=0) - cash0, 0.0), brokerage0 * keep)
+        start = cash0 + brokerage0
+        balances = (cash0 - spent + sold) + (brokerage0 - sold / keep)
+        sold = sold[-1]
+
+    # --- 3. SUMMARIZE ---
+    min_month = balances.argmin(axis=0)
+    recovered = hired & (balances >= start)
+    break_even = np.where(recovered.any(axis=0), recovered.argmax(axis=0), NEVER)
+
+    result = {
+        "min_balance": balances[min_month, np.arange(n)],
+        "min_balance_month": min_month,
+        "break_even_month": break_even,
+        "tax_paid": sold / keep * a.capital_gains_drag,
+    }
+    if keep_balances:
+        result["balances"] = balances
+    return result
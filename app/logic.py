@@ -1,107 +1,482 @@
-import os
 import math
-import anthropic
-import json
-from app.models import FinancialProfile, TransitionPlan, AIStrategy, LearningResource
+import asyncio
+import logging
+import numpy as np
+from dataclasses import replace
+from typing import Optional, List, Tuple, Union
+from app.models import (
+    FinancialProfile, FinancialProfileColumns, TransitionPlan, AIStrategy, AIStrategyDraft, LearningResource
+)
+from app import core
+from app.core import Household, Transition, Numbers
+from app.clients import get_client, get_async_client
+from app.cache import strategy_cache, make_key
+from app.streaming import StrategyStreamParser
+from app.singleflight import strategy_flight
+from app.parsing import parse_output, tool_spec, tool_params
+from app.router import router, Route, BudgetExceeded
+from app.rules import decide, rule_based_strategy
+from app.catalog import (
+    resource_catalog, Resource, PICKS, role_for, budget_for, prompt_lines, to_learning_resource
+)
+from app.admission import admission, Overloaded, TOKENS_PER_CALL
+from app.state import shared_state, WORKER_ID
+from app.metrics import timed, record_usage, log_event, FALLBACKS, STAGE_SECONDS
 
-# Initialize the Brain
+# The Brain is created lazily on first use (see app/clients.py)
 # CRITICAL: Make sure you set your API Key in your terminal or .env file!
 # export ANTHROPIC_API_KEY="sk-ant..."
-client = anthropic.Anthropic(api_key=os.environ.get("ANTHROPIC_API_KEY"))
+
+# Claude 3 Haiku (Universally available); per-tier models live in app/router.py
+MODEL = "claude-3-haiku-20240307"
+# Static instructions and output schema: identical on every call, so they live
+# in a system block marked for prompt caching (tools + system form the cached
+# prefix). Only the profile summary and its resource shortlist change per request.
+SYSTEM_PROMPT = (
+    "You are a career strategist and a JSON-only financial assistant. For the user's finances, give:\n"
+    "1. verdict: Low Risk, Medium Risk or High Risk\n"
+    "2. action_plan: 3 specific bullet points on how to bridge the gap or optimize study\n"
+    "3. resource_ids: the 2 best-fitting learning resources, as IDs from the Candidates list only\n"
+    'Return ONLY valid JSON: {"verdict": "string", "action_plan": ["string"], "resource_ids": ["string"]}'
+)
+SYSTEM_BLOCKS = [{"type": "text", "text": SYSTEM_PROMPT, "cache_control": {"type": "ephemeral"}}]
+# Claude answers through this tool, so the strategy arrives as schema-shaped JSON
+# (resources as catalog IDs, expanded by parse_strategy)
+STRATEGY_TOOL = tool_spec("submit_strategy", "Submit the career transition strategy.", AIStrategyDraft)
+# Fields a partial answer may leave out
+STRATEGY_DEFAULTS = {"verdict": "Unknown", "action_plan": ["Review finances"], "resource_ids": []}
+# How often a worker waiting on another worker's Claude call checks the shared cache
+PEER_POLL_SECONDS = 0.1
+
 
 class FinancialBridge:
     @staticmethod
-    def calculate(profile: FinancialProfile) -> TransitionPlan:
-        # --- 1. THE MATH (Deterministic) ---
-        burn_rate = profile.monthly_expenses
-        required_runway = burn_rate * profile.transition_months
-        
-        # Add safety buffer (Emergency Fund)
-        emergency_buffer = burn_rate * profile.emergency_fund_months
-        total_needed = required_runway + emergency_buffer
-        
-        gap = total_needed - profile.current_savings
-        
-        runway_months = 0
-        if burn_rate > 0:
-            runway_months = profile.current_savings / burn_rate
-
-        is_ready = gap <= 0
+    def to_core(profile: FinancialProfile) -> Tuple[Household, Transition]:
+        """The API profile as core engine values (the only Pydantic -> core conversion)."""
+        household = Household(profile.current_savings, 0.0, 0.0, 0.0, profile.monthly_expenses, 0.0, 0.0,
+                              None, profile.current_salary, profile.new_salary)
+        transition = Transition(profile.target_role or "", 0.0, profile.transition_months, 0.0,
+                                profile.emergency_fund_months)
+        return household, transition
 
-        # --- 2. THE BRAIN (AI Strategy) ---
-        
-        # FIX 1: Hardcode the Key temporarily to rule out environment issues
-        # (Delete this line later and go back to os.environ for security!)
-        # Back to secure mode
-        api_key = os.environ.get("ANTHROPIC_API_KEY") 
-        
-        # Re-initialize client with the direct key
-        secure_client = anthropic.Anthropic(api_key=api_key)
-        
-        prompt = f"""
-        You are a career strategist. Analyze this user:
-        - Savings: ${profile.current_savings}
-        - Monthly Burn: ${burn_rate}
-        - Runway: {runway_months:.1f} months
-        - Goal: Transition in {profile.transition_months} months
-        - Capital Gap: ${gap}
-        
-        Provide a JSON response with:
-        1. 'verdict': (Low/Medium/High Risk)
-        2. 'action_plan': 3 specific bullet points on how to bridge the gap or optimize study.
-        3. 'resources': 2 specific, real learning resources (courses/books) that are low-cost.
-        
-        Return ONLY valid JSON matching this structure:
-        {{
-            "verdict": "string",
-            "action_plan": ["string", "string"],
-            "resources": [{{"name": "string", "cost": "string"}}]
-        }}
+    @staticmethod
+    def run_math(profile: FinancialProfile) -> Numbers:
+        # --- 1. THE MATH (Deterministic, memoized in app/core.py) ---
+        # Burn is the monthly expenses; the plan needs the transition plus the emergency fund
+        return core.evaluate(*FinancialBridge.to_core(profile))
+
+    @staticmethod
+    def candidates(profile: FinancialProfile, numbers: Numbers) -> Tuple[Resource, ...]:
+        """The catalog shortlist for the target role, within the budget the capital gap leaves."""
+        return resource_catalog.shortlist(role_for(profile.target_role), budget_for(numbers.gap))
+
+    @staticmethod
+    def build_prompt(profile: FinancialProfile, numbers: Numbers) -> str:
+        # Just the per-user numbers, rounded to whole dollars, and the resources to pick from;
+        # instructions are in SYSTEM_PROMPT
+        return (f"Savings ${profile.current_savings:,.0f}; burn ${numbers.burn_rate:,.0f}/mo; "
+                f"runway {numbers.runway_months:.1f} mo; goal {profile.transition_months} mo; "
+                f"gap ${numbers.gap:,.0f}\n"
+                f"Candidates: {prompt_lines(FinancialBridge.candidates(profile, numbers))}")
+
+    @staticmethod
+    def parse_strategy(output, candidates: Tuple[Resource, ...] = ()) -> AIStrategy:
+        """
+        Validate a Claude message (tool_use or text) or raw text into an
+        AIStrategy, expanding the picked IDs into `candidates` entries.
         """
+        draft = parse_output(output, AIStrategyDraft, "financial_bridge", defaults=STRATEGY_DEFAULTS)
+        resources = resource_catalog.pick(draft.resource_ids, candidates)
+        return AIStrategy(verdict=draft.verdict, action_plan=draft.action_plan,
+                          resources=[to_learning_resource(r) for r in resources])
 
-        try:
-            message = secure_client.messages.create(
-                # FIX: Switched to Claude 3 Haiku (Universally available)
-                model="claude-3-haiku-20240307", 
-                max_tokens=500,
-                temperature=0,
-                system="You are a helpful JSON-only financial assistant.",
-                messages=[{"role": "user", "content": prompt}]
-            )
-            
-            
-            # Parse AI Response
-            ai_text = message.content[0].text
-            # Clean up potential markdown code blocks
-            if "```json" in ai_text:
-                ai_text = ai_text.split("```json")[1].split("```")[0].strip()
-            elif "```" in ai_text:
-                ai_text = ai_text.split("```")[1].split("```")[0].strip()
-                
-            ai_data = json.loads(ai_text)
-            
-            # Convert to Pydantic Models
-            resources = [LearningResource(**r) for r in ai_data.get('resources', [])]
-            strategy = AIStrategy(
-                verdict=ai_data.get('verdict', "Unknown"),
-                action_plan=ai_data.get('action_plan', ["Review finances"]),
-                resources=resources
-            )
+    @staticmethod
+    def cache_key(prompt: str, model: str = MODEL) -> str:
+        return make_key(model=model, system=SYSTEM_PROMPT, prompt=prompt)
 
-        except Exception as e:
-            print(f"AI Error: {e}")
-            # Fallback if AI fails (so app doesn't crash)
-            strategy = AIStrategy(
-                verdict="AI Offline", 
-                action_plan=["Check internet connection", "Verify API Key"], 
-                resources=[]
-            )
+    @staticmethod
+    async def cached_strategy(profile: FinancialProfile, numbers: Numbers,
+                              tier: Optional[str] = None) -> Optional[AIStrategy]:
+        model = router.route(tier).primary
+        key = FinancialBridge.cache_key(FinancialBridge.build_prompt(profile, numbers), model)
+        cached = await strategy_cache.aget(key)
+        return AIStrategy(**cached).tagged("cache", model) if cached is not None else None
+
+    @staticmethod
+    async def local_strategy(profile: FinancialProfile, numbers: Numbers,
+                             tier: Optional[str] = None) -> Optional[AIStrategy]:
+        """A strategy without calling Claude: the rules engine if it's confident, else a cached answer."""
+        return decide(profile, numbers) or await FinancialBridge.cached_strategy(profile, numbers, tier)
+
+    @staticmethod
+    def record_failure(error: Exception, timings: dict) -> None:
+        FALLBACKS.inc(component="financial_bridge", reason=type(error).__name__)
+        log_event("strategy_fallback", logging.WARNING, model=MODEL,
+                  error_type=type(error).__name__, error=str(error), timings=timings)
+
+    @staticmethod
+    def fallback_for(error: Exception, profile: FinancialProfile, numbers: Numbers) -> AIStrategy:
+        # Out of latency budget or upstream quota: answer from the numbers. Anything else is an outage.
+        if isinstance(error, (BudgetExceeded, Overloaded)):
+            return rule_based_strategy(profile, numbers).tagged("fallback")
+        return FinancialBridge.fallback_strategy(
+            resource_catalog.recommend(profile.target_role, numbers.gap)).tagged("fallback")
+
+    @staticmethod
+    def fallback_strategy(resources: Optional[List[LearningResource]] = None) -> AIStrategy:
+        # Fallback if AI fails (so app doesn't crash); resources still come from the catalog
+        return AIStrategy(
+            verdict="AI Offline",
+            action_plan=["Check internet connection", "Verify API Key"],
+            resources=resources or []
+        )
 
+    @staticmethod
+    def build_plan(numbers: Numbers, strategy: Optional[AIStrategy]) -> TransitionPlan:
         # --- 3. MERGE AND RETURN ---
         return TransitionPlan(
-            monthly_burn_rate=burn_rate,
-            total_runway_months=runway_months,
-            capital_gap=gap,
-            is_financially_ready=is_ready,
+            monthly_burn_rate=numbers.burn_rate,
+            total_runway_months=numbers.runway_months,
+            capital_gap=numbers.gap,
+            is_financially_ready=numbers.is_ready,
+            min_balance=numbers.min_balance,
+            min_balance_month=numbers.min_balance_month,
+            break_even_month=None if numbers.break_even_month == core.NEVER else numbers.break_even_month,
             strategy=strategy
         )
+
+    @staticmethod
+    def request_params(prompt: str, model: str = MODEL, timeout: Optional[float] = None) -> dict:
+        extra = {"timeout": timeout} if timeout is not None else {}
+        return dict(
+            model=model,
+            max_tokens=500,
+            temperature=0,
+            system=SYSTEM_BLOCKS,
+            messages=[{"role": "user", "content": prompt}],
+            **tool_params(STRATEGY_TOOL),
+            **extra
+        )
+
+    @staticmethod
+    def calculate(profile: FinancialProfile, tier: Optional[str] = None) -> TransitionPlan:
+        """Blocking version, kept for scripts and the Streamlit apps (budget, no hedging)."""
+        timings = {}
+        with timed("math", timings):
+            numbers = FinancialBridge.run_math(profile)
+
+        # --- 2. THE BRAIN (rules for clear-cut profiles, Claude for the rest) ---
+        strategy = decide(profile, numbers)
+        if strategy is not None:
+            return FinancialBridge.build_plan(numbers, strategy)
+
+        route = router.route(tier)
+        with timed("prompt", timings):
+            prompt = FinancialBridge.build_prompt(profile, numbers)
+            key = FinancialBridge.cache_key(prompt, route.primary)
+        cached = strategy_cache.get(key)
+        if cached is not None:
+            return FinancialBridge.build_plan(numbers, AIStrategy(**cached).tagged("cache", route.primary))
+
+        try:
+            with timed("anthropic", timings):
+                # No SDK retries: each one would get the whole budget again
+                client = get_client().with_options(max_retries=0)
+                message, model = router.call_sync(route, lambda model, timeout: client.messages.create(
+                    **FinancialBridge.request_params(prompt, model, timeout)
+                ))
+            usage = record_usage(message, model)
+            with timed("parse", timings):
+                strategy = FinancialBridge.parse_strategy(message, FinancialBridge.candidates(profile, numbers))
+            strategy.tagged("claude", model)
+            # Only real answers are cached, never a fallback
+            strategy_cache.set(key, strategy.model_dump())
+            log_event("strategy_generated", model=model, tier=route.tier, timings=timings, **usage)
+        except Exception as e:
+            FinancialBridge.record_failure(e, timings)
+            strategy = FinancialBridge.fallback_for(e, profile, numbers)
+
+        return FinancialBridge.build_plan(numbers, strategy)
+
+    @staticmethod
+    async def generate_strategy(profile: FinancialProfile, numbers: Numbers, async_client=None,
+                                tier: Optional[str] = None) -> AIStrategy:
+        """The rules engine's answer if it's confident, otherwise Claude's."""
+        strategy = decide(profile, numbers)
+        if strategy is not None:
+            return strategy
+        return await FinancialBridge.claude_strategy(profile, numbers, async_client, tier)
+
+    @staticmethod
+    async def claude_strategy(profile: FinancialProfile, numbers: Numbers, async_client=None,
+                              tier: Optional[str] = None) -> AIStrategy:
+        """Cache lookup, then one (coalesced) routed Claude call on the shared pooled client."""
+        route = router.route(tier)
+        with timed("prompt"):
+            prompt = FinancialBridge.build_prompt(profile, numbers)
+            key = FinancialBridge.cache_key(prompt, route.primary)
+        cached = await strategy_cache.aget(key)
+        if cached is not None:
+            return AIStrategy(**cached).tagged("cache", route.primary)
+
+        # Identical prompts already in flight share that one upstream call
+        return await strategy_flight.do(
+            key, lambda: FinancialBridge.request_strategy(profile, numbers, prompt, key, route, async_client)
+        )
+
+    @staticmethod
+    async def request_strategy(profile: FinancialProfile, numbers: Numbers, prompt: str, key: str,
+                               route: Route, async_client=None) -> AIStrategy:
+        client = async_client or await get_async_client()
+        timings = {}
+        try:
+            if not await FinancialBridge.lease(key, route):
+                # Another worker is already asking Claude for this prompt: share its answer
+                with timed("peer_wait", timings):
+                    strategy = await FinancialBridge.wait_for_peer(key, route)
+                if strategy is not None:
+                    return strategy
+            route = await FinancialBridge.admit(route, timings)
+            with timed("anthropic", timings):
+                message, model = await router.call(route, lambda model, timeout: client.messages.create(
+                    **FinancialBridge.request_params(prompt, model, timeout)
+                ))
+            usage = record_usage(message, model)
+            await admission.settle(TOKENS_PER_CALL, usage)
+            with timed("parse", timings):
+                strategy = FinancialBridge.parse_strategy(message, FinancialBridge.candidates(profile, numbers))
+            strategy.tagged("claude", model)
+            # Only real answers are cached, never a fallback
+            await strategy_cache.aset(key, strategy.model_dump())
+            log_event("strategy_generated", model=model, tier=route.tier, timings=timings, **usage)
+        except Overloaded:
+            raise  # Shed: the API answers 429 + Retry-After
+        except Exception as e:
+            FinancialBridge.record_failure(e, timings)
+            strategy = FinancialBridge.fallback_for(e, profile, numbers)
+        finally:
+            if shared_state is not None:
+                await asyncio.to_thread(shared_state.release_lease, key, WORKER_ID)
+        return strategy
+
+    @staticmethod
+    async def lease(key: str, route: Route) -> bool:
+        """Claim the prompt for this worker (always True without a shared backend)."""
+        if shared_state is None:
+            return True
+        # Outlives the holder's whole budget, so a crashed worker's lease expires
+        return await asyncio.to_thread(shared_state.acquire_lease, key, WORKER_ID, route.budget_seconds + 5)
+
+    @staticmethod
+    async def wait_for_peer(key: str, route: Route) -> Optional[AIStrategy]:
+        """
+        Poll the shared cache for the lease holder's answer. Returns None if
+        the lease came free without one (the holder failed): it's ours now.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + route.budget_seconds
+        while loop.time() < deadline:
+            await asyncio.sleep(PEER_POLL_SECONDS)
+            cached = await strategy_cache.aget(key)
+            if cached is not None:
+                # The lease holder's answer
+                return AIStrategy(**cached).tagged("cache", route.primary)
+            if await FinancialBridge.lease(key, route):
+                return None
+        raise router.exhausted(route)
+
+    @staticmethod
+    async def replay_strategy(strategy: AIStrategy):
+        """The events stream_claude_strategy would emit, for a strategy we already have (rules, cache)."""
+        for event in FinancialBridge.strategy_events(strategy):
+            yield event
+        yield "strategy", strategy
+
+    @staticmethod
+    async def stream_claude_strategy(profile: FinancialProfile, numbers: Numbers, async_client=None,
+                                     tier: Optional[str] = None):
+        """
+        Async generator of (event, data) pairs: 'verdict', 'action' and
+        'resource' as soon as each is complete in Claude's token stream, then
+        'strategy' with the validated AIStrategy. Streams use the tier's
+        primary model and budget only; they are not hedged. Callers try
+        local_strategy first.
+        """
+        route = router.route(tier)
+        prompt = FinancialBridge.build_prompt(profile, numbers)
+        candidates = FinancialBridge.candidates(profile, numbers)
+        offered = {r.id: r for r in candidates}
+        streamed = 0
+        parser = StrategyStreamParser()
+        timings = {}
+        loop = asyncio.get_running_loop()
+        try:
+            route = await FinancialBridge.admit(route, timings)
+            started = loop.time()
+            deadline = started + route.budget_seconds
+            with timed("anthropic_stream", timings):
+                client = (async_client or await get_async_client()).with_options(max_retries=0)
+                stream = client.messages.stream(
+                    **FinancialBridge.request_params(prompt, route.primary, route.budget_seconds)
+                )
+                async with stream as events:
+                    async for chunk in events:
+                        if loop.time() > deadline:
+                            raise router.exhausted(route)
+                        # Text deltas, or the tool input's JSON as it is written
+                        if chunk.type != "content_block_delta":
+                            continue
+                        if "first_token" not in timings:
+                            timings["first_token"] = round(loop.time() - started, 6)
+                            STAGE_SECONDS.observe(timings["first_token"], component="financial_bridge",
+                                                  stage="first_token")
+                        piece = getattr(chunk.delta, "text", None) or getattr(chunk.delta, "partial_json", "")
+                        for event, data in parser.feed(piece):
+                            if event == "resource_id":
+                                # Only IDs from the shortlist, once each, sent as the catalog entry
+                                resource = offered.pop(data, None)
+                                if resource is None or streamed >= PICKS:
+                                    continue
+                                streamed += 1
+                                event, data = "resource", to_learning_resource(resource).model_dump()
+                            yield event, data
+                    message = await events.get_final_message()
+                usage = record_usage(message, route.primary)
+                await admission.settle(TOKENS_PER_CALL, usage)
+            with timed("parse", timings):
+                strategy = FinancialBridge.parse_strategy(message, candidates).tagged("claude", route.primary)
+            await strategy_cache.aset(FinancialBridge.cache_key(prompt, route.primary), strategy.model_dump())
+            log_event("strategy_streamed", model=route.primary, tier=route.tier, timings=timings, **usage)
+            # Slots the model left empty were filled from the shortlist
+            for resource in strategy.resources[streamed:]:
+                yield "resource", resource.model_dump()
+        except Exception as e:
+            e = router.as_budget_error(route, e)
+            FinancialBridge.record_failure(e, timings)
+            strategy = FinancialBridge.fallback_for(e, profile, numbers)
+        yield "strategy", strategy
+
+    @staticmethod
+    async def admit(route: Route, timings: dict) -> Route:
+        """Wait for upstream quota; returns the route with what's left of its budget."""
+        try:
+            with timed("admission", timings):
+                waited = await admission.acquire(route.tier, TOKENS_PER_CALL, timeout=route.budget_seconds)
+        except asyncio.TimeoutError:
+            raise router.exhausted(route)
+        return replace(route, budget_seconds=route.budget_seconds - waited)
+
+    @staticmethod
+    def strategy_events(strategy: AIStrategy) -> list:
+        """The streaming events for an already complete strategy (cache hits)."""
+        return ([("verdict", strategy.verdict)]
+                + [("action", action) for action in strategy.action_plan]
+                + [("resource", r.model_dump()) for r in strategy.resources])
+
+    @staticmethod
+    async def calculate_async(profile: FinancialProfile, async_client=None,
+                              tier: Optional[str] = None) -> TransitionPlan:
+        """Non-blocking version used by the API."""
+        with timed("math"):
+            numbers = FinancialBridge.run_math(profile)
+
+        # --- 2. THE BRAIN (AI Strategy) ---
+        strategy = await FinancialBridge.generate_strategy(profile, numbers, async_client, tier)
+
+        return FinancialBridge.build_plan(numbers, strategy)
+
+    # --- BATCH MODE (Vectorized) ---
+    @staticmethod
+    def to_columns(profiles: Union[List[FinancialProfile], FinancialProfileColumns]) -> dict:
+        """Turn a list of profiles (or a columnar payload) into the core engine's NumPy columns."""
+        if isinstance(profiles, FinancialProfileColumns):
+            n = len(profiles)
+            efm = profiles.emergency_fund_months or [3] * n
+            return {
+                "fixed_expenses": np.asarray(profiles.monthly_expenses, dtype=float),
+                "cash_savings": np.asarray(profiles.current_savings, dtype=float),
+                "estimated_months": np.asarray(profiles.transition_months, dtype=float),
+                "emergency_fund_months": np.asarray(efm, dtype=float),
+                "new_salary": np.asarray([s or 0.0 for s in profiles.new_salary or [0.0] * n], dtype=float),
+            }
+        n = len(profiles)
+        return {
+            column: np.fromiter((getattr(p, field) or 0.0 for p in profiles), dtype=float, count=n)
+            for column, field in (("fixed_expenses", "monthly_expenses"), ("cash_savings", "current_savings"),
+                                  ("estimated_months", "transition_months"),
+                                  ("emergency_fund_months", "emergency_fund_months"), ("new_salary", "new_salary"))
+        }
+
+    @staticmethod
+    def run_math_many(cols: dict) -> dict:
+        """Same math as run_math, one array operation per step for all rows."""
+        return core.evaluate_many(cols)
+
+    @staticmethod
+    def rows(numbers: dict) -> List[Numbers]:
+        return core.rows(numbers)
+
+    @staticmethod
+    def calculate_many(profiles: Union[List[FinancialProfile], FinancialProfileColumns]) -> List[TransitionPlan]:
+        """Numbers only (no AI) for many profiles in one vectorized pass."""
+        with timed("batch_math"):
+            numbers = FinancialBridge.run_math_many(FinancialBridge.to_columns(profiles))
+        return [FinancialBridge.build_plan(row, None) for row in FinancialBridge.rows(numbers)]
+
+    @staticmethod
+    async def calculate_many_async(profiles: Union[List[FinancialProfile], FinancialProfileColumns],
+                                   include_strategy: bool = False,
+                                   max_concurrency: int = 8,
+                                   tier: Optional[str] = None, charge=None) -> tuple:
+        """
+        Batch version of calculate_async. Clear-cut profiles are answered by
+        the rules engine, identical prompts among the rest are sent once and
+        at most `max_concurrency` Claude calls run at the same time.
+        `charge` (async, optional) is awaited with the number of Claude calls
+        the batch needs before any is made; it may raise to refuse them.
+        Returns (plans, number of Claude calls made: distinct prompts the rules
+        and the strategy cache could not answer).
+        """
+        with timed("batch_math"):
+            numbers = FinancialBridge.rows(
+                FinancialBridge.run_math_many(FinancialBridge.to_columns(profiles))
+            )
+        if not include_strategy:
+            return [FinancialBridge.build_plan(row, None) for row in numbers], 0
+
+        if isinstance(profiles, FinancialProfileColumns):
+            fields = profiles.model_dump(exclude_none=True)
+            profiles = [FinancialProfile.model_construct(**dict(zip(fields, values)))
+                        for values in zip(*fields.values())]
+
+        # Dedup: one upstream call per distinct prompt the rules can't answer
+        model = router.route(tier).primary
+        unique = {}
+        answers = []  # An AIStrategy from the rules, or the cache key of a Claude answer
+        for profile, row in zip(profiles, numbers):
+            strategy = decide(profile, row)
+            if strategy is None:
+                strategy = FinancialBridge.cache_key(FinancialBridge.build_prompt(profile, row), model)
+                unique.setdefault(strategy, (profile, row))
+            answers.append(strategy)
+
+        # Prompts answered before cost nothing; the rest are the calls this batch makes
+        by_key = {}
+        for key, cached in (await strategy_cache.aget_many(unique)).items():
+            if cached is not None:
+                by_key[key] = AIStrategy(**cached).tagged("cache", model)
+                del unique[key]
+        if unique and charge is not None:
+            await charge(len(unique))
+
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def bounded(profile, row):
+            async with semaphore:
+                return await FinancialBridge.claude_strategy(profile, row, tier=tier)
+
+        strategies = await asyncio.gather(*(bounded(p, r) for p, r in unique.values()))
+        by_key.update(zip(unique, strategies))
+        plans = [FinancialBridge.build_plan(row, by_key[a] if isinstance(a, str) else a)
+                 for row, a in zip(numbers, answers)]
+        return plans, len(unique)
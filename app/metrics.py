@@ -0,0 +1,221 @@
+import json
+import time
+import logging
+import threading
+from bisect import bisect_left
+from typing import Callable, Dict, Optional, Tuple
+
+# --- METRICS & STRUCTURED LOGS ---
+# A tiny Prometheus-compatible registry (no extra dependency). Recording is a
+# perf_counter() pair, a bisect and two additions, so it can wrap every stage
+# of the hot path. Rendered on GET /metrics.
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                   0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+TOKEN_BUCKETS = (25, 50, 100, 250, 500, 1000, 2000, 4000, 8000, 16000)
+
+
+def _label_str(labels: Tuple) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels) + "}"
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+        self.values: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def snapshot(self) -> list:
+        """(labels, value) pairs copied under the lock: /metrics and /health read them from a thread."""
+        with self._lock:
+            return list(self.values.items())
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        lines += [f"{self.name}{_label_str(k)} {v}" for k, v in self.snapshot()]
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = buckets
+        self.series: Dict[Tuple, list] = {}  # labels -> [per-bucket counts..., overflow, sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = [0] * (len(self.buckets) + 3)
+            series[bisect_left(self.buckets, value)] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        # Copied under the lock, so a series is never rendered half-updated
+        with self._lock:
+            snapshot = [(key, list(series)) for key, series in self.series.items()]
+        for key, series in snapshot:
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_label_str(key + (('le', bound),))} {cumulative}")
+            lines.append(f"{self.name}_bucket{_label_str(key + (('le', '+Inf'),))} {series[-1]}")
+            lines.append(f"{self.name}_sum{_label_str(key)} {series[-2]}")
+            lines.append(f"{self.name}_count{_label_str(key)} {series[-1]}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+        self.collectors = []  # Callables returning {name: value} gauges at scrape time
+
+    def counter(self, name: str, help_text: str) -> Counter:
+        metric = Counter(name, help_text)
+        self.metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help_text: str, buckets: tuple = LATENCY_BUCKETS) -> Histogram:
+        metric = Histogram(name, help_text, buckets)
+        self.metrics.append(metric)
+        return metric
+
+    def register_collector(self, prefix: str, collect: Callable[[], dict]) -> None:
+        self.collectors.append((prefix, collect))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines += metric.render()
+        for prefix, collect in self.collectors:
+            for name, value in collect().items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    lines.append(f"# TYPE {prefix}_{name} gauge")
+                    lines.append(f"{prefix}_{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+STAGE_SECONDS = registry.histogram(
+    "careerpivot_stage_seconds", "Time spent per stage of strategy generation")
+REQUEST_SECONDS = registry.histogram(
+    "careerpivot_http_request_seconds", "End-to-end HTTP request latency")
+TOKENS = registry.counter(
+    "careerpivot_anthropic_tokens_total", "Tokens reported by the Anthropic API")
+REQUEST_TOKENS = registry.histogram(
+    "careerpivot_anthropic_request_tokens", "Tokens per Anthropic request", TOKEN_BUCKETS)
+FALLBACKS = registry.counter(
+    "careerpivot_strategy_fallbacks_total", "Strategies replaced by a fallback answer")
+
+
+class timed:
+    """
+    with timed("anthropic", timings): ...
+    Records the stage duration in STAGE_SECONDS and, if given, in `timings`
+    (a dict that ends up in the structured log line).
+    """
+    __slots__ = ("stage", "component", "timings", "start")
+
+    def __init__(self, stage: str, timings: Optional[dict] = None, component: str = "financial_bridge"):
+        self.stage = stage
+        self.component = component
+        self.timings = timings
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        STAGE_SECONDS.observe(elapsed, component=self.component, stage=self.stage)
+        if self.timings is not None:
+            self.timings[self.stage] = round(elapsed, 6)
+        return False
+
+
+def record_usage(message, model: str, component: str = "financial_bridge") -> dict:
+    """Count token usage (totals and per request) from an Anthropic response; returns it for logging."""
+    usage = getattr(message, "usage", None)
+    if usage is None:
+        return {}
+    counts = {}
+    for kind in ("input_tokens", "output_tokens", "cache_read_input_tokens", "cache_creation_input_tokens"):
+        value = getattr(usage, kind, None) or 0
+        if value:
+            TOKENS.inc(value, component=component, model=model, kind=kind)
+            REQUEST_TOKENS.observe(value, component=component, kind=kind)
+            counts[kind] = value
+    return counts
+
+
+class LatencyMiddleware:
+    """Plain ASGI middleware: request latency by route template and status."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        start = time.perf_counter()
+        scope.setdefault("state", {})["received_at"] = start
+        status = [500]
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = getattr(scope.get("route"), "path", "unmatched")
+            REQUEST_SECONDS.observe(time.perf_counter() - start, path=route, status=status[0])
+
+
+def observe_validation(request) -> None:
+    """Call first thing in a handler: time from arrival to a validated body."""
+    received_at = getattr(request.state, "received_at", None)
+    if received_at is not None:
+        STAGE_SECONDS.observe(time.perf_counter() - received_at, component="api", stage="validation")
+
+
+# --- Structured logs: one JSON object per line ---
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": round(record.created, 3),
+            "level": record.levelname.lower(),
+            "event": record.getMessage(),
+        }
+        payload.update(getattr(record, "fields", {}))
+        return json.dumps(payload, default=str)
+
+
+logger = logging.getLogger("careerpivot")
+if not logger.handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(JsonFormatter())
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+def log_event(event: str, level: int = logging.INFO, **fields) -> None:
+    if logger.isEnabledFor(level):
+        logger.log(level, event, extra={"fields": fields})
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field
-from typing import Optional, List
+from pydantic import BaseModel, Field, PrivateAttr, model_validator
+from typing import Optional, List, Annotated, Literal, Union
 
 # --- NEW: AI Advice Structure ---
 class LearningResource(BaseModel):
@@ -12,6 +12,57 @@ class AIStrategy(BaseModel):
     action_plan: List[str] = Field(..., description="Immediate steps to take")
     resources: List[LearningResource] = Field(..., description="Recommended courses/books")
 
+    # Where the answer came from (rules, cache, claude, fallback) and the model that
+    # wrote it: recorded in the analysis history, not part of the API response
+    _source: Optional[str] = PrivateAttr(None)
+    _model: Optional[str] = PrivateAttr(None)
+
+    @property
+    def source(self) -> Optional[str]:
+        return self._source
+
+    @property
+    def model(self) -> Optional[str]:
+        return self._model
+
+    def tagged(self, source: str, model: Optional[str] = None) -> "AIStrategy":
+        self._source = source
+        self._model = model
+        return self
+
+# What Claude actually returns: resources are picked by ID from the prompt's
+# catalog shortlist (app/catalog.py) and expanded into an AIStrategy by us
+class AIStrategyDraft(BaseModel):
+    verdict: str = Field(..., description="Risk assessment: Low, Medium, High")
+    action_plan: List[str] = Field(..., description="Immediate steps to take")
+    resource_ids: List[str] = Field(..., description="IDs picked from the Candidates list")
+
+# --- CareerAI (app/services/ai_agent.py) ---
+class FinancialProfileInput(BaseModel):
+    cash_savings: float = Field(..., ge=0)
+    fixed_expenses: float = Field(..., ge=0)
+    variable_expenses: float = Field(0, ge=0)
+
+class CareerGoalInput(BaseModel):
+    target_role: str
+    upskilling_cost: float = Field(0, ge=0)
+    estimated_months: int = Field(..., gt=0)
+
+class CourseRecommendation(BaseModel):
+    name: str
+    cost: Union[float, str] = 0
+    platform: Optional[str] = None
+
+class AIRecommendation(BaseModel):
+    verdict: str = Field(..., description="Low Risk, Medium Risk or High Risk")
+    suggested_actions: List[str]
+    learning_resources: List[CourseRecommendation]
+
+class AIRecommendationDraft(BaseModel):
+    verdict: str = Field(..., description="Low Risk, Medium Risk or High Risk")
+    suggested_actions: List[str]
+    resource_ids: List[str] = Field(..., description="IDs picked from the Candidates list")
+
 # --- EXISTING: Financial Models (Kept valid) ---
 class FinancialProfile(BaseModel):
     current_salary: float = Field(..., gt=0)
@@ -20,6 +71,7 @@ class FinancialProfile(BaseModel):
     transition_months: int = Field(..., gt=0)
     new_salary: Optional[float] = Field(None)
     emergency_fund_months: int = Field(3)
+    target_role: Optional[str] = Field(None, description="Picks the learning resources, e.g. 'Data Analyst'")
 
 class TransitionPlan(BaseModel):
     # Financials
@@ -27,6 +79,80 @@ class TransitionPlan(BaseModel):
     total_runway_months: float
     capital_gap: float
     is_financially_ready: bool
+
+    # Month-by-month ledger (app/ledger.py): lowest balance, and when the
+    # new salary has earned back what the transition cost (None: not within 3 years)
+    min_balance: Optional[float] = None
+    min_balance_month: Optional[int] = None
+    break_even_month: Optional[int] = None
     
     # The New "Brain" Section
-    strategy: AIStrategy  # <--- This is the new part!
+    strategy: Optional[AIStrategy] = None  # <--- This is the new part!
+
+    # Set instead of `strategy` when the AI section is deferred (/analyze?defer=true)
+    strategy_job_id: Optional[str] = None
+
+# --- Deferred AI Strategy Jobs ---
+class StrategyJob(BaseModel):
+    job_id: str
+    status: str = Field(..., description="pending, running, done or failed")
+    strategy: Optional[AIStrategy] = None
+    error: Optional[str] = None
+
+
+# --- Batch Analysis (/analyze/batch) ---
+class FinancialProfileColumns(BaseModel):
+    """Columnar form of many FinancialProfiles: one list per field, same length."""
+    current_salary: List[Annotated[float, Field(gt=0)]]
+    monthly_expenses: List[Annotated[float, Field(gt=0)]]
+    current_savings: List[Annotated[float, Field(ge=0)]]
+    transition_months: List[Annotated[int, Field(gt=0)]]
+    new_salary: Optional[List[Optional[float]]] = None
+    emergency_fund_months: Optional[List[int]] = None
+    target_role: Optional[List[Optional[str]]] = None
+
+    @model_validator(mode="after")
+    def check_lengths(self):
+        n = len(self.current_salary)
+        for name, values in self:
+            if values is not None and len(values) != n:
+                raise ValueError(f"column '{name}' has {len(values)} rows, expected {n}")
+        return self
+
+    def __len__(self):
+        return len(self.current_salary)
+
+class BatchAnalysisRequest(BaseModel):
+    profiles: Optional[List[FinancialProfile]] = None
+    columns: Optional[FinancialProfileColumns] = None
+    include_strategy: bool = False
+    max_concurrency: int = Field(8, gt=0, le=64)
+
+    @model_validator(mode="after")
+    def check_payload(self):
+        if (self.profiles is None) == (self.columns is None):
+            raise ValueError("send exactly one of 'profiles' or 'columns'")
+        return self
+
+class BatchAnalysisResponse(BaseModel):
+    count: int
+    unique_strategies: int = 0  # Claude calls the batch made (cache hits and rules answers excluded)
+    plans: List[TransitionPlan]
+
+
+# --- PDF Reports (/report, /reports/batch) ---
+# Plans per /reports/batch request: the whole zip or PDF is built in memory
+MAX_BATCH_REPORTS = 1000
+
+class ReportContext(BaseModel):
+    role: str
+    timeline: int
+    risk: str
+
+class ReportRequest(BaseModel):
+    plan: TransitionPlan
+    context: ReportContext
+
+class BatchReportRequest(BaseModel):
+    reports: List[ReportRequest] = Field(..., min_length=1, max_length=MAX_BATCH_REPORTS)
+    format: Literal["zip", "pdf"] = "zip"  # zip of PDFs, or one multi-page PDF
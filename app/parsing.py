@@ -0,0 +1,89 @@
+import os
+import json
+from typing import Optional, Tuple, Type, TypeVar
+from pydantic import BaseModel, ValidationError
+from app.metrics import registry
+
+# --- MODEL OUTPUT PARSING ---
+# The one place a Claude response becomes a validated Pydantic model.
+#   * tool_use blocks (structured output): the input is already a dict
+#   * text: prose and ``` fences are skipped, and the first JSON object is
+#     decoded straight out of the string (no split/strip copies)
+# Every attempt is counted by outcome, so the failure rate is on /metrics.
+TOOL_USE = os.environ.get("ANTHROPIC_TOOL_USE", "1") == "1"
+
+PARSES = registry.counter(
+    "careerpivot_model_output_parses_total", "Model outputs parsed, by source and outcome")
+
+M = TypeVar("M", bound=BaseModel)
+_decoder = json.JSONDecoder()
+
+
+class ParseError(ValueError):
+    """The model output held no JSON object matching the expected schema."""
+
+
+def extract_json(text: str) -> dict:
+    """Decode the first JSON object in `text`, ignoring anything around it."""
+    start = text.find("{")
+    while start != -1:
+        try:
+            value, _ = _decoder.raw_decode(text, start)
+            if isinstance(value, dict):
+                return value
+        except ValueError:
+            pass  # A stray brace in prose, try the next one
+        start = text.find("{", start + 1)
+    raise ParseError("No JSON object found in model output")
+
+
+def tool_spec(name: str, description: str, model: Type[BaseModel]) -> dict:
+    """An Anthropic tool whose input schema is the Pydantic model's."""
+    return {"name": name, "description": description, "input_schema": model.model_json_schema()}
+
+
+def tool_params(tool: dict) -> dict:
+    """Extra messages.create() kwargs forcing Claude to answer through `tool`."""
+    if not TOOL_USE:
+        return {}
+    return {"tools": [tool], "tool_choice": {"type": "tool", "name": tool["name"]}}
+
+
+def message_payload(message) -> Tuple[dict, str]:
+    """(data, source) from an Anthropic message: the tool input if any, else JSON in the text."""
+    text = []
+    for block in message.content:
+        if block.type == "tool_use":
+            return dict(block.input), "tool"
+        if block.type == "text":
+            text.append(block.text)
+    return extract_json("".join(text)), "text"
+
+
+def parse_output(output, model: Type[M], component: str, defaults: Optional[dict] = None) -> M:
+    """
+    Validate a model response (Anthropic message, raw text or tool-input dict)
+    into `model`. Raises ParseError, and counts every outcome.
+    """
+    source = "text"
+    try:
+        if isinstance(output, str):
+            data = extract_json(output)
+        elif isinstance(output, dict):
+            data, source = output, "tool"
+        else:
+            data, source = message_payload(output)
+        result = model.model_validate({**defaults, **data} if defaults else data)
+    except (ParseError, ValidationError) as e:
+        PARSES.inc(component=component, source=source, outcome="failed")
+        raise ParseError(str(e)) from e
+    PARSES.inc(component=component, source=source, outcome="ok")
+    return result
+
+
+def parse_stats() -> dict:
+    values = PARSES.snapshot()
+    ok = sum(v for k, v in values if ("outcome", "ok") in k)
+    failed = sum(v for k, v in values if ("outcome", "failed") in k)
+    total = ok + failed
+    return {"ok": ok, "failed": failed, "failure_rate": round(failed / total, 4) if total else 0.0}
@@ -0,0 +1,156 @@
+import io
+import zipfile
+from functools import lru_cache
+from typing import List
+from fpdf import FPDF
+
+# --- PDF REPORT RENDERING ---
+# Pure functions of plain dicts so they can run in a worker process.
+# The layout class and all static text are built once at import; only the
+# per-user sections are drawn per report.
+BRAND = 'VANTAGE DIGITAL'
+SUBTITLE = 'Career Transition Strategic Report'
+
+
+@lru_cache(maxsize=4096)
+def pdf_text(text) -> str:
+    """
+    Core PDF fonts use the cp1252 (WinAnsi) code page, so map to it once per
+    distinct string instead of re-encoding through latin-1 everywhere.
+    Unsupported characters become '?'.
+    """
+    return str(text).encode('cp1252', 'replace').decode('latin-1')
+
+
+FOOTER_TEMPLATE = pdf_text('Vantage Digital Strategy • Page {}')
+
+
+class ReportPDF(FPDF):
+    def header(self):
+        # 1. Dark Blue Brand Banner
+        self.set_fill_color(26, 35, 126) # Deep Navy Blue
+        self.rect(0, 0, 210, 40, 'F')
+
+        # 2. Title Text (White)
+        self.set_y(10)
+        self.set_font('Arial', 'B', 24)
+        self.set_text_color(255, 255, 255)
+        self.cell(0, 10, BRAND, 0, 1, 'C')
+
+        # 3. Subtitle
+        self.set_font('Arial', 'I', 12)
+        self.cell(0, 10, SUBTITLE, 0, 1, 'C')
+        self.ln(20)
+
+    def footer(self):
+        self.set_y(-15)
+        self.set_font('Arial', 'I', 8)
+        self.set_text_color(128, 128, 128)
+        self.cell(0, 10, FOOTER_TEMPLATE.format(self.page_no()), 0, 0, 'C')
+
+    def section_title(self, label):
+        self.set_font('Arial', 'B', 14)
+        self.set_fill_color(240, 240, 240) # Light Grey
+        self.set_text_color(0, 0, 0)
+        self.cell(0, 10, pdf_text(f"  {label}"), 0, 1, 'L', fill=True)
+        self.ln(4)
+
+    def financial_row(self, label, value):
+        self.set_font('Arial', '', 11)
+        self.cell(100, 8, label, 1) # Border=1 for grid look
+        self.set_font('Arial', 'B', 11)
+        self.cell(0, 8, value, 1, 1) # '1' at end means new line
+
+
+def draw_report(pdf: ReportPDF, data: dict, profile_inputs: dict) -> None:
+    """Draw one TransitionPlan (as a dict) onto a fresh page of `pdf`."""
+    pdf.add_page()
+    pdf.set_text_color(0, 0, 0)
+
+    # --- SECTION 1: EXECUTIVE SUMMARY ---
+    pdf.section_title("1. Executive Summary")
+    pdf.set_font('Arial', '', 11)
+
+    # Target Role Context
+    pdf.multi_cell(0, 6, pdf_text(f"Strategic analysis for the transition to: {profile_inputs['role']}.\n"
+                                  f"Timeline: {profile_inputs['timeline']} months | Risk Profile: {profile_inputs['risk']}"))
+    pdf.ln(5)
+
+    # --- SECTION 2: FINANCIAL HEALTH ---
+    pdf.section_title("2. Financial Reality")
+
+    # Creating a Grid Table
+    pdf.financial_row("Monthly Burn Rate (Lean)", f"${data['monthly_burn_rate']:,.0f}")
+    pdf.financial_row("Current Runway", f"{data['total_runway_months']:.1f} Months")
+    pdf.financial_row("Capital Gap (Deficit)", f"${data['capital_gap']:,.0f}")
+
+    if data['capital_gap'] > 0:
+        pdf.set_text_color(192, 57, 43) # Red for warning
+        pdf.cell(0, 10, "  (!) WARNING: Capital deficit detected. Upskilling requires funding.", 0, 1)
+        pdf.set_text_color(0, 0, 0) # Reset
+    else:
+        pdf.set_text_color(39, 174, 96) # Green for good
+        pdf.cell(0, 10, "  (OK) You are fully funded for this transition.", 0, 1)
+        pdf.set_text_color(0, 0, 0)
+
+    pdf.ln(5)
+
+    # --- SECTION 3: AI STRATEGY ---
+    strategy = data.get('strategy')
+    if strategy:
+        pdf.section_title(f"3. AI Strategy Verdict: {strategy['verdict']}")
+
+        # Action Plan Box
+        pdf.set_fill_color(255, 252, 230) # Light Yellow Background for tips
+        pdf.set_font('Arial', 'B', 11)
+        pdf.cell(0, 8, "Immediate Action Plan:", 0, 1, fill=True)
+        pdf.set_font('Arial', '', 10)
+
+        for action in strategy['action_plan']:
+            pdf.multi_cell(0, 6, pdf_text(f"- {action}"), fill=True)
+
+        pdf.ln(5)
+
+        # Resources Box
+        pdf.set_fill_color(232, 248, 245) # Light Green/Teal Background
+        pdf.set_font('Arial', 'B', 11)
+        pdf.cell(0, 8, "Recommended Resources:", 0, 1, fill=True)
+        pdf.set_font('Arial', '', 10)
+
+        for res in strategy['resources']:
+            if isinstance(res, dict):
+                pdf.multi_cell(0, 6, pdf_text(f"- {res.get('name', '')} ({res.get('cost', '')})"), fill=True)
+            else:
+                pdf.multi_cell(0, 6, pdf_text(f"- {res}"), fill=True)
+
+
+def to_bytes(pdf: ReportPDF) -> bytes:
+    return pdf.output(dest='S').encode('latin-1')
+
+
+def render_report(data: dict, profile_inputs: dict) -> bytes:
+    pdf = ReportPDF()
+    draw_report(pdf, data, profile_inputs)
+    return to_bytes(pdf)
+
+
+def render_many(items: List[tuple]) -> List[bytes]:
+    """One PDF per (data, profile_inputs) pair; the unit of work for a pool worker."""
+    return [render_report(data, profile_inputs) for data, profile_inputs in items]
+
+
+def render_combined(items: List[tuple]) -> bytes:
+    """All reports in one multi-page PDF, each starting on a new page."""
+    pdf = ReportPDF()
+    for data, profile_inputs in items:
+        draw_report(pdf, data, profile_inputs)
+    return to_bytes(pdf)
+
+
+def zip_reports(pdfs: List[bytes], name: str = "report_{:05d}.pdf") -> bytes:
+    buffer = io.BytesIO()
+    # Page streams are already deflated by FPDF, so ZIP_STORED keeps zipping near-free
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_STORED) as archive:
+        for i, pdf in enumerate(pdfs):
+            archive.writestr(name.format(i), pdf)
+    return buffer.getvalue()
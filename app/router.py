@@ -0,0 +1,135 @@
+import os
+import json
+import asyncio
+from dataclasses import dataclass, replace
+from typing import Awaitable, Callable, Optional, Tuple
+from app.metrics import registry
+
+# --- MODEL ROUTING ---
+# Each request tier maps to a route: the model to ask first, an optional
+# faster "hedge" model, and a latency budget. If the primary hasn't answered
+# (or has already failed) by `hedge_after` seconds, the same request goes to
+# the hedge model and whichever answers first wins. When the budget runs out
+# BudgetExceeded is raised and the caller falls back to the rule-based
+# strategy (app/rules.py).
+#
+# Override routes with STRATEGY_ROUTES, e.g.
+#   STRATEGY_ROUTES='{"pro": {"budget_seconds": 20}, "free": {"primary": "claude-3-haiku-20240307"}}'
+FAST_MODEL = "claude-3-haiku-20240307"
+SMART_MODEL = "claude-3-5-sonnet-20240620"
+DEFAULT_TIER = os.environ.get("STRATEGY_DEFAULT_TIER", "standard")
+
+ROUTE_CALLS = registry.counter(
+    "careerpivot_model_calls_total", "Routed model calls by tier, model, role and outcome")
+BUDGET_EXHAUSTED = registry.counter(
+    "careerpivot_latency_budget_exhausted_total", "Strategy calls that ran out of latency budget")
+
+
+class BudgetExceeded(TimeoutError):
+    """No model answered within the route's latency budget."""
+
+
+@dataclass(frozen=True)
+class Route:
+    tier: str
+    primary: str
+    budget_seconds: float
+    hedge: Optional[str] = None
+    hedge_after_seconds: float = 0.0
+
+
+DEFAULT_ROUTES = {
+    "free": Route("free", FAST_MODEL, budget_seconds=6.0),
+    "standard": Route("standard", FAST_MODEL, budget_seconds=10.0),
+    "pro": Route("pro", SMART_MODEL, budget_seconds=15.0, hedge=FAST_MODEL, hedge_after_seconds=5.0),
+}
+
+
+class ModelRouter:
+    def __init__(self, routes: dict = None, default_tier: str = DEFAULT_TIER):
+        self.routes = dict(routes or DEFAULT_ROUTES)
+        self.default_tier = default_tier
+
+    @classmethod
+    def from_env(cls) -> "ModelRouter":
+        routes = dict(DEFAULT_ROUTES)
+        for tier, overrides in json.loads(os.environ.get("STRATEGY_ROUTES", "{}")).items():
+            base = routes.get(tier, Route(tier, FAST_MODEL, budget_seconds=10.0))
+            routes[tier] = replace(base, **overrides)
+        return cls(routes)
+
+    def route(self, tier: Optional[str] = None) -> Route:
+        try:
+            return self.routes[tier or self.default_tier]
+        except KeyError:
+            raise ValueError(f"Unknown tier '{tier}', expected one of {sorted(self.routes)}")
+
+    def exhausted(self, route: Route) -> BudgetExceeded:
+        BUDGET_EXHAUSTED.inc(tier=route.tier)
+        return BudgetExceeded(f"No answer within {route.budget_seconds}s ({route.tier})")
+
+    def as_budget_error(self, route: Route, error: Exception) -> Exception:
+        """SDK timeouts (the budget passed as `timeout=`) become BudgetExceeded."""
+        import anthropic
+        if isinstance(error, anthropic.APITimeoutError):
+            return self.exhausted(route)
+        return error
+
+    async def call(self, route: Route, request: Callable[[str, float], Awaitable]) -> Tuple[object, str]:
+        """
+        Run `request(model, timeout)` for the route's primary model, hedging to
+        the faster model if needed. Returns (response, model that answered).
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + route.budget_seconds
+        hedge_at = None
+        if route.hedge and route.hedge != route.primary:
+            hedge_at = loop.time() + route.hedge_after_seconds
+
+        tasks = {asyncio.ensure_future(request(route.primary, route.budget_seconds)): ("primary", route.primary)}
+        error = None
+        try:
+            while True:
+                now = loop.time()
+                if now >= deadline:
+                    raise self.exhausted(route)
+                if hedge_at is not None and (now >= hedge_at or not tasks):
+                    # Primary is slow (or already failed): race the faster model
+                    hedge_at = None
+                    task = asyncio.ensure_future(request(route.hedge, deadline - now))
+                    tasks[task] = ("hedge", route.hedge)
+                if not tasks:
+                    raise error
+
+                wake = deadline if hedge_at is None else min(deadline, hedge_at)
+                done, _ = await asyncio.wait(tasks, timeout=wake - now, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    role, model = tasks.pop(task)
+                    if task.exception() is None:
+                        ROUTE_CALLS.inc(tier=route.tier, model=model, role=role, outcome="won")
+                        return task.result(), model
+                    error = task.exception()
+                    ROUTE_CALLS.inc(tier=route.tier, model=model, role=role, outcome="error")
+        finally:
+            for task, (role, model) in tasks.items():
+                task.cancel()
+                ROUTE_CALLS.inc(tier=route.tier, model=model, role=role, outcome="cancelled")
+
+    def call_sync(self, route: Route, request: Callable[[str, float], object]) -> Tuple[object, str]:
+        """
+        Blocking version: primary model only, bounded by the budget. `request`
+        should not retry, or each attempt gets the whole budget.
+        """
+        try:
+            response = request(route.primary, route.budget_seconds)
+        except Exception as e:
+            error = self.as_budget_error(route, e)
+            if error is e:
+                ROUTE_CALLS.inc(tier=route.tier, model=route.primary, role="primary", outcome="error")
+                raise
+            raise error from e
+        ROUTE_CALLS.inc(tier=route.tier, model=route.primary, role="primary", outcome="won")
+        return response, route.primary
+
+
+router = ModelRouter.from_env()
@@ -0,0 +1,90 @@
+import os
+from dataclasses import dataclass
+from app.models import FinancialProfile, AIStrategy
+from app.core import Numbers
+from app.catalog import resource_catalog
+from app.metrics import registry
+
+# --- RULE-BASED STRATEGY ENGINE (no LLM) ---
+# Most profiles are clear-cut from the numbers run_math already has: the
+# runway is far above the plan (plus emergency fund) or far below it. Those
+# get a deterministic strategy straight away; only profiles close to a
+# decision boundary (confidence below the threshold) are escalated to Claude.
+# The same engine is the fallback when Claude misses its latency budget.
+#
+# Confidence is 0.5 on a boundary and grows with the distance from the
+# nearest one, relative to the planned transition length:
+#   runway 6.0 vs. plan 6 + 3 months buffer  -> 0.50 (ambiguous, ask Claude)
+#   runway 2.0 vs. plan 6                    -> 1.00 (clearly High Risk)
+# Set STRATEGY_RULES_THRESHOLD above 1 to send every profile to Claude.
+CONFIDENCE_THRESHOLD = float(os.environ.get("STRATEGY_RULES_THRESHOLD", "0.8"))
+
+RULE_DECISIONS = registry.counter(
+    "careerpivot_rule_decisions_total", "Profiles answered by the rules engine vs. escalated to the LLM")
+
+
+@dataclass(frozen=True)
+class RuleDecision:
+    strategy: AIStrategy
+    confidence: float
+
+    def confident(self, threshold: float = CONFIDENCE_THRESHOLD) -> bool:
+        return self.confidence >= threshold
+
+
+def assess(profile: FinancialProfile, numbers: Numbers) -> RuleDecision:
+    """Verdict, action plan and resources from runway, gap and emergency-fund coverage."""
+    runway = numbers.runway_months
+    gap = numbers.gap
+    burn = numbers.burn_rate
+    months = profile.transition_months
+    # Months of emergency fund left once the planned transition is paid for
+    buffer_months = runway - months
+
+    if gap <= 0:
+        verdict = "Low Risk"
+        actions = [
+            f"Your savings cover {runway:.1f} months, including your emergency fund: set a firm start date",
+            f"Ring-fence your {profile.emergency_fund_months}-month emergency fund "
+            f"(${profile.emergency_fund_months * burn:,.0f}) and don't touch it for tuition",
+            "Spend month 1 on a portfolio project in your target role",
+        ]
+    elif buffer_months >= 0:
+        verdict = "Medium Risk"
+        actions = [
+            f"You can cover the transition but only {buffer_months:.1f} of {profile.emergency_fund_months} "
+            f"emergency months: save ${gap:,.0f} more first",
+            "Cut discretionary spending to stretch your runway by a month or two",
+            "Pick up part-time or freelance work in your current field while you study",
+        ]
+    else:
+        verdict = "High Risk"
+        actions = [
+            f"Your runway ({runway:.1f} months) is shorter than your {months}-month plan: don't quit yet",
+            f"Close the ${-buffer_months * burn:,.0f} runway shortfall by saving or lowering your ${burn:,.0f} monthly burn",
+            "Start learning part-time with free resources before paying for a course",
+        ]
+
+    boundaries = (months, months + profile.emergency_fund_months)
+    distance = min(abs(runway - b) for b in boundaries) / max(months, 1)
+    confidence = min(1.0, 0.5 + distance)
+
+    # Straight from the catalog index: free only with a capital gap, some paid picks with a surplus
+    resources = resource_catalog.recommend(profile.target_role, gap)
+    strategy = AIStrategy(verdict=verdict, action_plan=actions, resources=resources)
+    return RuleDecision(strategy=strategy, confidence=round(confidence, 3))
+
+
+def decide(profile: FinancialProfile, numbers: Numbers, threshold: float = CONFIDENCE_THRESHOLD):
+    """The rules' strategy if they're confident enough, else None (escalate to the LLM)."""
+    decision = assess(profile, numbers)
+    if decision.confident(threshold):
+        RULE_DECISIONS.inc(outcome="answered", verdict=decision.strategy.verdict)
+        return decision.strategy.tagged("rules")
+    RULE_DECISIONS.inc(outcome="escalated", verdict=decision.strategy.verdict)
+    return None
+
+
+def rule_based_strategy(profile: FinancialProfile, numbers: Numbers) -> AIStrategy:
+    """The rules' answer regardless of confidence (LLM budget fallback)."""
+    return assess(profile, numbers).strategy
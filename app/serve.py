@@ -0,0 +1,48 @@
+import os
+import argparse
+
+# --- PRODUCTION LAUNCHER ---
+#   python -m app.serve                      # one worker per CPU core
+#   python -m app.serve --workers 4 --port 8080
+#
+# Several workers share the strategy cache, deferred job results and rate-limit
+# counters through one SQLite file (app/state.py), and a prompt being answered
+# by one worker is never sent to Claude again by another. On SIGTERM uvicorn
+# stops accepting connections, lets open requests finish, then each worker
+# drains its in-flight Claude calls (SHUTDOWN_DRAIN_SECONDS) before exiting.
+
+
+def shared_env(workers: int) -> None:
+    """Defaults for the worker processes (explicit env vars win)."""
+    cores = os.cpu_count() or 1
+    if workers > 1:
+        os.environ.setdefault("STATE_BACKEND", "sqlite")
+    # Each worker has its own PDF process pool: split the cores between them
+    os.environ.setdefault("REPORT_WORKERS", str(max(1, cores // workers)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the Career Transition API with N workers")
+    parser.add_argument("--host", default=os.environ.get("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", "8000")))
+    parser.add_argument("--workers", type=int,
+                        default=int(os.environ.get("WEB_CONCURRENCY", str(os.cpu_count() or 1))))
+    args = parser.parse_args()
+
+    shared_env(args.workers)
+    drain = float(os.environ.get("SHUTDOWN_DRAIN_SECONDS", "20"))
+
+    import uvicorn
+    uvicorn.run(
+        "app.main:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        # Open requests get the drain window too, plus a margin for the lifespan shutdown
+        timeout_graceful_shutdown=int(drain) + 5,
+        log_level=os.environ.get("LOG_LEVEL", "info"),
+    )
+
+
+if __name__ == "__main__":
+    main()
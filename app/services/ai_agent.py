@@ -1,79 +1,104 @@
-import os
-import json
-import anthropic
-from app.models import FinancialProfileInput, CareerGoalInput, AIRecommendation
+import logging
+from app.models import (
+    FinancialProfileInput, CareerGoalInput, AIRecommendation, AIRecommendationDraft, CourseRecommendation
+)
+from app.catalog import resource_catalog, PICKS, role_for, prompt_lines
+from app.clients import get_client
+from app.parsing import parse_output, tool_spec, tool_params
+from app.router import router
+from app.metrics import timed, record_usage, log_event, FALLBACKS
+
+# Model and latency budget come from the tier's route (app/router.py); "pro" is Claude 3.5 Sonnet
+TIER = "pro"
+
+# The client is created lazily on first use (see app/clients.py)
+
+# Claude answers through this tool, so the reply is already schema-shaped JSON
+# (learning resources as IDs from the catalog shortlist in the prompt)
+RECOMMENDATION_TOOL = tool_spec(
+    "submit_recommendation", "Submit the career transition recommendation.", AIRecommendationDraft)
 
-# Initialize the Client
-client = anthropic.Anthropic(
-    api_key=os.environ.get("ANTHROPIC_API_KEY"),
+# Static instructions + output schema, cached by Anthropic prompt caching;
+# only the short user line changes per call
+SYSTEM_PROMPT = (
+    "You are CareerPivot-AI, a strategic career advisor. "
+    "Your goal is to create a realistic transition plan based STRICTLY on the user's "
+    "financial constraints. Do not recommend expensive bootcamps if they are broke.\n"
+    "Task:\n"
+    "1. Determine if this transition is 'High Risk', 'Medium Risk', or 'Low Risk'.\n"
+    "2. Suggest 3 concrete actions they must take in Month 1.\n"
+    "3. Pick the 2 best-fitting learning resources, as IDs from the Candidates list only.\n"
+    'Return ONLY valid JSON: {"verdict": "Low Risk", "suggested_actions": ["Action 1"], '
+    '"resource_ids": ["id"]}'
 )
+SYSTEM_BLOCKS = [{"type": "text", "text": SYSTEM_PROMPT, "cache_control": {"type": "ephemeral"}}]
+
 
 class CareerAI:
     @staticmethod
-    def analyze_path(profile: FinancialProfileInput, goal: CareerGoalInput) -> AIRecommendation:
-        
-        # 1. Construct the Context (The Prompt)
-        system_prompt = (
-            "You are CareerPivot-AI, a strategic career advisor. "
-            "Your goal is to create a realistic transition plan based STRICTLY on the user's "
-            "financial constraints. Do not recommend expensive bootcamps if they are broke."
-        )
+    def candidates(goal: CareerGoalInput) -> tuple:
+        """The catalog shortlist for the target role within the upskilling budget."""
+        return resource_catalog.shortlist(role_for(goal.target_role), float(int(goal.upskilling_cost)))
 
-        user_message = f"""
-        ANALYZE THIS USER:
-        - Current Role: {goal.target_role} (Target)
-        - Cash Savings: ${profile.cash_savings}
-        - Monthly Burn: ${profile.fixed_expenses + profile.variable_expenses}
-        - Transition Budget: ${goal.upskilling_cost}
-        - Time Limit: {goal.estimated_months} months
-        
-        TASK:
-        1. Determine if this transition is 'High Risk', 'Medium Risk', or 'Low Risk'.
-        2. Suggest 3 concrete actions they must take in Month 1.
-        3. Recommend 2 specific learning resources that fit their ${goal.upskilling_cost} budget.
-        
-        OUTPUT FORMAT:
-        Return ONLY valid JSON matching this structure:
-        {{
-            "verdict": "Low Risk",
-            "suggested_actions": ["Action 1", "Action 2", "Action 3"],
-            "learning_resources": [
-                {{"name": "Course Name", "cost": 0, "platform": "Provider"}}
-            ]
-        }}
-        """
+    @staticmethod
+    def build_prompt(profile: FinancialProfileInput, goal: CareerGoalInput) -> tuple:
+        user_message = (f"Target role: {goal.target_role}; savings ${profile.cash_savings:,.0f}; "
+                        f"burn ${profile.fixed_expenses + profile.variable_expenses:,.0f}/mo; "
+                        f"budget ${goal.upskilling_cost:,.0f}; time limit {goal.estimated_months} mo\n"
+                        f"Candidates: {prompt_lines(CareerAI.candidates(goal))}")
+        return SYSTEM_BLOCKS, user_message
 
-        # 2. Call Claude 3.5 Sonnet
-        message = client.messages.create(
-            model="claude-3-5-sonnet-20240620",
-            max_tokens=1000,
-            temperature=0,
-            system=system_prompt,
-            messages=[
-                {"role": "user", "content": user_message}
-            ]
+    @staticmethod
+    def parse_recommendation(message, goal: CareerGoalInput) -> AIRecommendation:
+        """The validated answer, with the picked IDs expanded into catalog entries."""
+        draft = parse_output(message, AIRecommendationDraft, "career_ai")
+        resources = resource_catalog.pick(draft.resource_ids, CareerAI.candidates(goal))
+        return AIRecommendation(
+            verdict=draft.verdict,
+            suggested_actions=draft.suggested_actions,
+            learning_resources=[CourseRecommendation(name=r.name, cost=r.cost, platform=r.provider)
+                                for r in resources]
         )
 
-        # 3. Parse the JSON Response
-        # Claude sometimes adds text before/after JSON, so we extract the clean block
-        raw_text = message.content[0].text
+    @staticmethod
+    def analyze_path(profile: FinancialProfileInput, goal: CareerGoalInput, tier: str = TIER) -> AIRecommendation:
+        timings = {}
+        route = router.route(tier)
+
+        # 1. Construct the Context (The Prompt)
+        with timed("prompt", timings, component="career_ai"):
+            system, user_message = CareerAI.build_prompt(profile, goal)
+
+        # 2. Call the tier's model (Claude 3.5 Sonnet by default), bounded by its budget
+        with timed("anthropic", timings, component="career_ai"):
+            client = get_client().with_options(max_retries=0)
+            message, model = router.call_sync(route, lambda model, timeout: client.messages.create(
+                model=model,
+                timeout=timeout,
+                max_tokens=1000,
+                temperature=0,
+                system=system,
+                messages=[
+                    {"role": "user", "content": user_message}
+                ],
+                **tool_params(RECOMMENDATION_TOOL)
+            ))
+        usage = record_usage(message, model, component="career_ai")
+
+        # 3. Parse the JSON Response (tool input, or the JSON object inside the text)
         try:
-            # Simple cleanup to ensure we just get the JSON object
-            json_str = raw_text.strip()
-            if "```json" in json_str:
-                json_str = json_str.split("```json")[1].split("```")[0]
-            
-            data = json.loads(json_str)
-            
-            return AIRecommendation(
-                verdict=data["verdict"],
-                suggested_actions=data["suggested_actions"],
-                learning_resources=data["learning_resources"]
-            )
+            with timed("parse", timings, component="career_ai"):
+                recommendation = CareerAI.parse_recommendation(message, goal)
+            log_event("recommendation_generated", model=model, timings=timings, **usage)
+            return recommendation
         except Exception as e:
             # Fallback if AI hallucinates the format
+            FALLBACKS.inc(component="career_ai", reason=type(e).__name__)
+            log_event("recommendation_fallback", logging.WARNING, model=model,
+                      error_type=type(e).__name__, error=str(e), timings=timings)
             return AIRecommendation(
                 verdict="Error parsing AI response",
                 suggested_actions=["Manual review required"],
-                learning_resources=[]
+                learning_resources=[CourseRecommendation(name=r.name, cost=r.cost, platform=r.provider)
+                                    for r in CareerAI.candidates(goal)[:PICKS]]
             )
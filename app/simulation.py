@@ -0,0 +1,105 @@
+import numpy as np
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+# --- MONTE CARLO RUNWAY ENGINE ---
+# Replaces the fixed RISK_MULTIPLIERS fudge factor with sampled uncertainty.
+# Arrays are laid out (months, paths) and the only Python loop is over months,
+# so 100k paths x 24 months stays around the 100 ms mark.
+
+
+@dataclass(frozen=True)
+class MonteCarloAssumptions:
+    hunt_shape: float = 4.0            # Gamma shape of the job hunt (CV = 1/sqrt(shape) = 50%)
+    shock_probability: float = 0.08    # Chance of an unplanned bill in any month
+    shock_mean_months: float = 0.5     # Average shock size, in months of lean burn
+    spouse_loss_hazard: float = 0.01   # Monthly chance the spouse/side income stops
+    annual_return: float = 0.06        # Brokerage drift
+    annual_volatility: float = 0.16    # Brokerage volatility
+
+
+# How sure the user wants to be that the money lasts (replaces RISK_MULTIPLIERS)
+CONFIDENCE_BY_RISK = {'low': 0.95, 'medium': 0.80, 'high': 0.65}
+PERCENTILES = (5, 25, 50, 75, 95)
+
+
+def simulate_runway(cash: float, brokerage: float, spouse_income: float, passive_income: float,
+                    lean_expenses: float, upskilling_cost: float, insurance_gap: float,
+                    estimated_months: int, risk_tolerance: str = 'medium',
+                    n_paths: int = 100_000, horizon_months: Optional[int] = None,
+                    seed: Optional[int] = None,
+                    assumptions: MonteCarloAssumptions = MonteCarloAssumptions()) -> Dict:
+    a = assumptions
+    rng = np.random.default_rng(seed)
+    horizon = horizon_months or max(18, 2 * int(estimated_months))
+
+    # --- 1. SAMPLE THE WORLD (one draw per path, or per path-month) ---
+    hunt = np.ceil(rng.gamma(a.hunt_shape, estimated_months / a.hunt_shape, n_paths))
+    spouse_loss_month = rng.geometric(a.spouse_loss_hazard, n_paths) if a.spouse_loss_hazard > 0 \
+        else np.full(n_paths, np.inf)
+
+    shocks = np.zeros((horizon, n_paths))
+    hit = rng.random((horizon, n_paths)) < a.shock_probability
+    shocks[hit] = rng.exponential(a.shock_mean_months * lean_expenses, int(hit.sum()))
+
+    mu = a.annual_return / 12 - a.annual_volatility ** 2 / 24
+    sigma = a.annual_volatility / np.sqrt(12)
+    # The market draws are the biggest cost: skipped without a brokerage (nothing
+    # is drawn after them, so the other samples don't change), built in place
+    if brokerage > 0:
+        growth = rng.standard_normal((horizon, n_paths))
+        growth *= sigma
+        growth += mu
+        np.exp(growth, out=growth)
+
+    # --- 2. WALK THE MONTHS (vectorized across paths) ---
+    cash_bal = np.full(n_paths, float(cash) - upskilling_cost)  # Pay tuition day 1
+    broker_bal = np.full(n_paths, float(brokerage))
+    totals = np.empty((horizon + 1, n_paths))
+    totals[0] = cash_bal + broker_bal
+
+    monthly_cost = lean_expenses + insurance_gap - passive_income
+    for t in range(1, horizon + 1):
+        searching = hunt >= t
+        income = np.where(spouse_loss_month > t, spouse_income, 0.0)
+        need = np.where(searching, monthly_cost + shocks[t - 1] - income, 0.0)
+
+        # Brokerage compounds, then cash is spent first and the rest is sold
+        if brokerage > 0:
+            broker_bal = np.where(broker_bal > 0, broker_bal * growth[t - 1], broker_bal)
+        cash_bal -= need
+        overdraft = np.minimum(cash_bal, 0.0)
+        cash_bal -= overdraft
+        broker_bal += overdraft
+        totals[t] = cash_bal + broker_bal
+
+    # --- 3. SUMMARIZE ---
+    liquid_assets = float(cash) + float(brokerage)
+    min_balance = totals.min(axis=0)
+    ruined = min_balance < 0
+    depletion = liquid_assets - min_balance  # Capital needed to never go negative
+    confidence = CONFIDENCE_BY_RISK.get(risk_tolerance, 0.80)
+    required_capital = float(np.quantile(depletion, confidence))
+
+    # totals isn't needed any more: ordered in place. A full sort, because NumPy's
+    # SIMD sort beats np.partition/np.quantile at five ranks per row here
+    idx = [min(n_paths - 1, int(round(p / 100 * (n_paths - 1)))) for p in PERCENTILES]
+    totals.sort(axis=1)
+    bands = {f"p{p}": totals[:, i].copy() for p, i in zip(PERCENTILES, idx)}
+
+    # Only the worst 5% has to be found, not ordered
+    n_worst = max(1, n_paths // 20)
+    worst = np.partition(min_balance, n_worst - 1)[:n_worst]
+
+    return {
+        "n_paths": n_paths,
+        "months": np.arange(horizon + 1),
+        "probability_of_ruin": float(ruined.mean()),
+        "expected_shortfall": float(-min_balance[ruined].mean()) if ruined.any() else 0.0,
+        "cvar_5": float(worst.mean()),  # Mean lowest balance over the worst 5% of paths
+        "median_hire_month": float(np.median(hunt)),
+        "confidence": confidence,
+        "required_capital": required_capital,
+        "gap": required_capital - liquid_assets,
+        "bands": bands,
+    }
@@ -0,0 +1,45 @@
+import asyncio
+from typing import Awaitable, Callable, Dict
+
+# --- SINGLE-FLIGHT (Request Coalescing) ---
+# When many identical requests arrive together (webinar traffic, all on the
+# default profile), only the first one calls Claude; the rest await the same
+# task and share its parsed result. Across worker processes the same job is
+# done by a lease in the shared state (see FinancialBridge.request_strategy).
+
+
+class SingleFlight:
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.leaders = 0      # Calls that actually went upstream
+        self.coalesced = 0    # Calls that piggybacked on an in-flight one
+
+    async def do(self, key: str, fn: Callable[[], Awaitable]):
+        task = self._inflight.get(key)
+        if task is None:
+            self.leaders += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.coalesced += 1
+        # shield: one caller disconnecting must not cancel the shared call
+        return await asyncio.shield(task)
+
+    async def drain(self, timeout: float) -> int:
+        """Wait up to `timeout` for in-flight calls on shutdown; returns how many were still running."""
+        tasks = list(self._inflight.values())
+        if not tasks:
+            return 0
+        _, pending = await asyncio.wait(tasks, timeout=timeout)
+        return len(pending)
+
+    def stats(self) -> dict:
+        return {
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._inflight),
+        }
+
+
+strategy_flight = SingleFlight()
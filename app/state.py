@@ -0,0 +1,159 @@
+import os
+import json
+import time
+import socket
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Optional, Sequence, Tuple
+
+# --- SHARED STATE (multi-worker deployments) ---
+# With several uvicorn workers (python -m app.serve) every process has its own
+# memory, so anything that must be seen by all of them lives in one SQLite
+# file in WAL mode (concurrent readers, one short writer at a time):
+#   * leases:  which worker is currently asking Claude for a prompt, so the
+#              others wait for its cached answer instead of paying again
+#   * jobs:    deferred strategy results, pollable from any worker
+#   * buckets: Anthropic RPM/TPM and per-client rate-limit counters
+# STATE_BACKEND=memory (the default, single process) keeps all of it in-process.
+BACKEND = os.environ.get("STATE_BACKEND", "memory").lower()
+PATH = os.environ.get("STATE_PATH", "careerpivot_state.db")
+BUSY_TIMEOUT_MS = int(os.environ.get("STATE_BUSY_TIMEOUT_MS", "5000"))
+
+# Identifies this process as a lease owner
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+
+def connect(path: str) -> sqlite3.Connection:
+    """Autocommit connection tuned for several processes sharing one file."""
+    conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+    return conn
+
+
+class SQLiteState:
+    backend = "sqlite"
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = connect(path)
+        self._lock = threading.Lock()
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS leases ("
+            " key TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " job_id TEXT PRIMARY KEY, status TEXT NOT NULL, value TEXT NOT NULL, updated_at REAL NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS jobs_updated ON jobs (updated_at);"
+            "CREATE TABLE IF NOT EXISTS buckets ("
+            " name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL);"
+        )
+
+    @contextmanager
+    def transaction(self):
+        # IMMEDIATE takes the write lock up front, so read-modify-write is atomic across workers
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    # --- Leases ---
+    def acquire_lease(self, key: str, owner: str, ttl_seconds: float) -> bool:
+        """Take (or renew) the lease on `key` unless another owner holds an unexpired one."""
+        now = time.time()
+        with self.transaction() as conn:
+            row = conn.execute("SELECT owner, expires_at FROM leases WHERE key = ?", (key,)).fetchone()
+            if row is not None and row[0] != owner and row[1] > now:
+                return False
+            conn.execute("INSERT OR REPLACE INTO leases VALUES (?, ?, ?)", (key, owner, now + ttl_seconds))
+            return True
+
+    def release_lease(self, key: str, owner: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM leases WHERE key = ? AND owner = ?", (key, owner))
+
+    # --- Jobs ---
+    def save_job(self, job_id: str, status: str, value: dict) -> None:
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO jobs VALUES (?, ?, ?, ?)",
+                               (job_id, status, json.dumps(value), time.time()))
+
+    def load_job(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def prune_jobs(self, max_jobs: int) -> None:
+        """Forget the oldest finished jobs beyond `max_jobs`."""
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM jobs WHERE job_id IN ("
+                " SELECT job_id FROM jobs WHERE status IN ('done', 'failed')"
+                " ORDER BY updated_at DESC LIMIT -1 OFFSET ?)",
+                (max_jobs,),
+            )
+
+    # --- Token buckets ---
+    def bucket_level(self, name: str, rate: float, capacity: float) -> float:
+        with self._lock:
+            row = self._conn.execute("SELECT tokens, updated_at FROM buckets WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            return capacity
+        return min(capacity, row[0] + (time.time() - row[1]) * rate)
+
+    def bucket_add(self, name: str, rate: float, capacity: float, amount: float) -> float:
+        """Refill, add `amount` (negative to take) capped at `capacity`; returns the new level."""
+        now = time.time()
+        with self.transaction() as conn:
+            row = conn.execute("SELECT tokens, updated_at FROM buckets WHERE name = ?", (name,)).fetchone()
+            tokens = capacity if row is None else min(capacity, row[0] + (now - row[1]) * rate)
+            tokens = min(capacity, tokens + amount)
+            conn.execute("INSERT OR REPLACE INTO buckets VALUES (?, ?, ?)", (name, tokens, now))
+        return tokens
+
+    def buckets_try_take(self, takes: Sequence[Tuple[str, float, float, float]]) -> float:
+        """
+        Take each (name, rate, capacity, amount) in one transaction, all or
+        none; returns 0, or the seconds until all of them could be taken.
+        """
+        now = time.time()
+        levels = []
+        wait = 0.0
+        with self.transaction() as conn:
+            for name, rate, capacity, amount in takes:
+                row = conn.execute("SELECT tokens, updated_at FROM buckets WHERE name = ?", (name,)).fetchone()
+                tokens = capacity if row is None else min(capacity, row[0] + (now - row[1]) * rate)
+                # Requests bigger than the bucket only need a full bucket
+                wait = max(wait, (min(amount, capacity) - tokens) / rate)
+                levels.append((name, tokens - amount, now))
+            if wait <= 0:
+                conn.executemany("INSERT OR REPLACE INTO buckets VALUES (?, ?, ?)", levels)
+        return max(0.0, wait)
+
+    def prune_buckets(self, prefix: str, idle_seconds: float) -> None:
+        """Drop buckets untouched for `idle_seconds` (they'd be full again anyway)."""
+        with self._lock:
+            self._conn.execute("DELETE FROM buckets WHERE name LIKE ? AND updated_at < ?",
+                               (prefix + "%", time.time() - idle_seconds))
+
+    def stats(self) -> dict:
+        with self._lock:
+            leases = self._conn.execute("SELECT COUNT(*) FROM leases WHERE expires_at > ?",
+                                        (time.time(),)).fetchone()[0]
+            jobs = self._conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+        return {"backend": self.backend, "worker": WORKER_ID, "leases": leases, "jobs": jobs}
+
+
+def build_state() -> Optional[SQLiteState]:
+    """The shared backend, or None when each process keeps its own state."""
+    if BACKEND == "sqlite":
+        return SQLiteState(PATH)
+    return None
+
+
+shared_state = build_state()
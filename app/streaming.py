@@ -0,0 +1,85 @@
+import json
+from typing import List, Tuple
+
+# --- INCREMENTAL STRATEGY PARSER ---
+# Claude's answer arrives token by token. Rather than waiting for the whole
+# JSON document, this scans each new chunk once and reports every piece of
+# the strategy the moment it is complete:
+#   ("verdict", "Medium Risk")
+#   ("action", "Freelance 10h/week")          one per action_plan item
+#   ("resource", {"name": ..., "cost": ...})  one per resources entry
+#   ("resource_id", "odin-project")           one per resource_ids entry (catalog picks)
+# Prose or ``` fences before the opening brace are skipped.
+
+
+class StrategyStreamParser:
+    def __init__(self):
+        self.buffer = ""
+        self.pos = 0
+        self.depth = 0             # Combined {} / [] nesting depth
+        self.started = False
+        self.in_string = False
+        self.escaped = False
+        self.string_start = 0
+        self.object_start = 0
+        self.expect_key = False
+        self.current_key = None
+
+    def feed(self, chunk: str) -> List[Tuple[str, object]]:
+        self.buffer += chunk
+        events = []
+        buf = self.buffer
+
+        for i in range(self.pos, len(buf)):
+            ch = buf[i]
+
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif ch == "\\":
+                    self.escaped = True
+                elif ch == '"':
+                    self.in_string = False
+                    self._on_string(json.loads(buf[self.string_start:i + 1]), events)
+                continue
+
+            if not self.started:
+                if ch == "{":
+                    self.started = True
+                    self.depth = 1
+                    self.expect_key = True
+                continue
+            if self.depth == 0:
+                continue  # Anything after the closing brace is ignored
+
+            if ch == '"':
+                self.in_string = True
+                self.string_start = i
+            elif ch in "{[":
+                self.depth += 1
+                if ch == "{" and self.depth == 3 and self.current_key == "resources":
+                    self.object_start = i
+            elif ch in "}]":
+                self.depth -= 1
+                if ch == "}" and self.depth == 2 and self.current_key == "resources":
+                    try:
+                        events.append(("resource", json.loads(buf[self.object_start:i + 1])))
+                    except ValueError:
+                        pass
+            elif ch == "," and self.depth == 1:
+                self.expect_key = True
+
+        self.pos = len(buf)
+        return events
+
+    def _on_string(self, value: str, events: list) -> None:
+        if self.depth == 1:
+            if self.expect_key:
+                self.current_key = value
+                self.expect_key = False
+            elif self.current_key == "verdict":
+                events.append(("verdict", value))
+        elif self.depth == 2 and self.current_key == "action_plan":
+            events.append(("action", value))
+        elif self.depth == 2 and self.current_key == "resource_ids":
+            events.append(("resource_id", value))
@@ -1,78 +1,113 @@
 import streamlit as st
-import pandas as pd
-import plotly.graph_objects as go
-from dataclasses import dataclass
-from typing import Dict
-
-# --- 1. CORE LOGIC (Embedded for Portability) ---
-@dataclass
-class FinancialProfile:
-    cash_savings: float
-    brokerage_taxable: float
-    spouse_net_income: float
-    passive_income: float
-    fixed_expenses: float
-    variable_expenses: float
-    discretionary_expenses: float
-    risk_tolerance: str
-
-@dataclass
-class TransitionPlan:
-    target_role: str
-    upskilling_cost: float
-    estimated_months: int
-    health_insurance_gap: float
-
-class CareerPivotCalculator:
-    RISK_MULTIPLIERS = {'low': 1.5, 'medium': 1.25, 'high': 1.1}
-
-    def __init__(self, profile: FinancialProfile, plan: TransitionPlan):
-        self.profile = profile
-        self.plan = plan
-
-    def calculate_burn_rates(self) -> Dict[str, float]:
-        monthly_income = self.profile.spouse_net_income + self.profile.passive_income
-        total_outflow_comfort = (self.profile.fixed_expenses + 
-                               self.profile.variable_expenses + 
-                               self.profile.discretionary_expenses)
-        burn_comfort = total_outflow_comfort - monthly_income
-        
-        total_outflow_lean = (self.profile.fixed_expenses + 
-                            self.profile.variable_expenses)
-        burn_lean = total_outflow_lean - monthly_income
-
-        return {"comfort": max(0, burn_comfort), "lean": max(0, burn_lean)}
-
-    def run_simulation(self) -> Dict:
-        burn_rates = self.calculate_burn_rates()
-        liquid_assets = self.profile.cash_savings + self.profile.brokerage_taxable
-        
-        # Base Transition Cost
-        base_cost_lean = (
-            (burn_rates['lean'] * self.plan.estimated_months) + 
-            self.plan.upskilling_cost + 
-            (self.plan.health_insurance_gap * self.plan.estimated_months)
-        )
-
-        multiplier = self.RISK_MULTIPLIERS.get(self.profile.risk_tolerance, 1.25)
-        required_capital = base_cost_lean * multiplier
-        gap = required_capital - liquid_assets
-        
-        # Runway Calculation
-        runway_months = liquid_assets / burn_rates['lean'] if burn_rates['lean'] > 0 else 999
-
-        return {
-            "metrics": {
-                "burn_lean": burn_rates['lean'],
-                "required_capital": required_capital,
-                "current_assets": liquid_assets,
-                "gap": gap,
-                "runway": runway_months
-            },
-            "burn_data": burn_rates # Passing this specifically for the chart
-        }
-
-# --- 2. THE STREAMLIT UI ---
+from app.calculator import FinancialProfile, TransitionPlan, CareerPivotCalculator
+from app.projection import project_balances
+
+# --- MEMOIZED CALCULATIONS ---
+# Streamlit reruns the whole script on every widget touch; these caches make
+# reruns with unchanged inputs skip the math and the figure build entirely.
+CACHE_TTL_SECONDS = 600
+CACHE_MAX_ENTRIES = 256
+
+
+@st.cache_data(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS, show_spinner=False)
+def run_calculator(cash, brokerage, spouse_income, fixed, variable, fun_money, months, bootcamp_cost, risk):
+    profile = FinancialProfile(cash, brokerage, spouse_income, 0, fixed, variable, fun_money, risk)
+    plan = TransitionPlan("Target Role", bootcamp_cost, months, 400)
+    engine = CareerPivotCalculator(profile, plan)
+    # Fixed seed so the same inputs always draw the same simulated futures
+    return engine.run_simulation(), engine.run_monte_carlo(n_paths=100_000, horizon_months=18, seed=0)
+
+
+# Figures are shared read-only objects, so cache_resource avoids a pickle copy per rerun
+@st.cache_resource(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS, show_spinner=False)
+def build_trajectory_figure(cash, brokerage, spouse_income, fixed, variable, fun_money, months, bootcamp_cost, risk):
+    import plotly.graph_objects as go  # Loaded on the first chart, after the metrics are on screen
+
+    results, mc = run_calculator(cash, brokerage, spouse_income, fixed, variable, fun_money,
+                                 months, bootcamp_cost, risk)
+    metrics = results['metrics']
+
+    # Generate data points for the chart (both scenarios in one call)
+    projection = project_balances(
+        metrics['current_assets'] - bootcamp_cost, # Pay tuition day 1
+        results['burn_data'],
+        horizon_months=18 # Show 18 months out
+    )
+    months_range = projection['months']
+    balance_history = projection['lean']
+
+    # Create Plotly Chart
+    fig = go.Figure()
+
+    # 0. Monte Carlo range (5th-95th percentile) and median
+    bands = mc['bands']
+    fig.add_trace(go.Scatter(x=mc['months'], y=bands['p95'], mode='lines', line=dict(width=0),
+                             showlegend=False, hoverinfo='skip'))
+    fig.add_trace(go.Scatter(x=mc['months'], y=bands['p5'], mode='lines', line=dict(width=0),
+                             fill='tonexty', fillcolor='rgba(0, 204, 150, 0.15)', name='5th-95th Percentile'))
+    fig.add_trace(go.Scatter(x=mc['months'], y=bands['p50'], mode='lines',
+                             name='Median Outcome', line=dict(color='#00CC96', dash='dash')))
+
+    # 1. The Money Line
+    fig.add_trace(go.Scatter(x=months_range, y=balance_history, mode='lines+markers', 
+                             name='Bank Balance', line=dict(color='#00CC96', width=4)))
+    fig.add_trace(go.Scatter(x=months_range, y=projection['comfort'], mode='lines',
+                             name='Comfort Mode', line=dict(color='#FFA15A', dash='dot')))
+
+    # 2. The Danger Zone (Zero Line)
+    fig.add_hline(y=0, line_dash="dot", line_color="red", annotation_text="Broke")
+
+    # 3. The "Got Hired" Milestone Vertical Line
+    fig.add_vline(x=months, line_dash="dash", line_color="white", annotation_text="Planned Hire Date")
+
+    # Layout
+    fig.update_layout(
+        title="Projected Savings Balance (Lean Mode)",
+        xaxis_title="Months from Quitting",
+        yaxis_title="Liquid Assets ($)",
+        template="plotly_dark",
+        height=400
+    )
+    return fig
+
+
+# The whole decision space depends only on finances, so moving the months,
+# cost or risk widgets just slices this one cached grid
+@st.cache_data(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS, show_spinner=False)
+def run_sweep(cash, brokerage, spouse_income, fixed, variable, fun_money):
+    profile = FinancialProfile(cash, brokerage, spouse_income, 0, fixed, variable, fun_money, "medium")
+    plan = TransitionPlan("Target Role", 0, 6, 400)
+    return CareerPivotCalculator(profile, plan).run_sweep()
+
+
+@st.cache_resource(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS, show_spinner=False)
+def build_sweep_figure(cash, brokerage, spouse_income, fixed, variable, fun_money, months, bootcamp_cost, risk, cut):
+    import plotly.graph_objects as go
+
+    sweep = run_sweep(cash, brokerage, spouse_income, fixed, variable, fun_money)
+    cut_idx = list(sweep['discretionary_cuts']).index(cut)
+    gap = sweep['gap'][:, sweep['risks'].index(risk), cut_idx, :]  # (months, cost)
+
+    fig = go.Figure(go.Heatmap(
+        x=sweep['months'], y=sweep['education_costs'], z=gap.T,
+        colorscale='RdYlGn', reversescale=True, zmid=0,
+        colorbar=dict(title="Gap ($)"),
+        hovertemplate="%{x} months, $%{y:,.0f} course<br>Gap: $%{z:,.0f}<extra></extra>"
+    ))
+    # Where the sidebar plan sits on the map
+    fig.add_trace(go.Scatter(x=[months], y=[bootcamp_cost], mode='markers', name='Your Plan',
+                             marker=dict(symbol='x', size=14, color='white')))
+    fig.update_layout(
+        title=f"Capital Gap by Job Hunt Length and Education Cost ({risk} risk)",
+        xaxis_title="Job Hunt Duration (Months)",
+        yaxis_title="Education Cost ($)",
+        template="plotly_dark",
+        height=400
+    )
+    return fig
+
+
+# --- THE STREAMLIT UI ---
 st.set_page_config(page_title="CareerPivot Calculator", layout="wide")
 
 st.title("🚀 CareerPivot: The 'Can I Quit?' Calculator")
@@ -94,11 +129,9 @@ months = st.sidebar.slider("Estimated Job Hunt Duration (Months)", 3, 12, 6)
 bootcamp_cost = st.sidebar.number_input("Education Cost (One-time)", value=5000, step=500)
 risk = st.sidebar.selectbox("Risk Tolerance", ["low", "medium", "high"], index=1)
 
-# --- RUN CALCULATION ---
-profile = FinancialProfile(cash, brokerage, spouse_income, 0, fixed, variable, fun_money, risk)
-plan = TransitionPlan("Target Role", bootcamp_cost, months, 400)
-engine = CareerPivotCalculator(profile, plan)
-results = engine.run_simulation()
+# --- RUN CALCULATION (memoized on the input values) ---
+inputs = (cash, brokerage, spouse_income, fixed, variable, fun_money, months, bootcamp_cost, risk)
+results, mc = run_calculator(*inputs)
 metrics = results['metrics']
 
 # --- MAIN DISPLAY ---
@@ -111,48 +144,27 @@ col3.metric("Capital Gap", f"${metrics['gap']:,.0f}",
             delta_color="inverse" if metrics['gap'] > 0 else "normal",
             help="Positive means you need MORE money. Negative means you are safe.")
 
+col4, col5, col6 = st.columns(3)
+col4.metric("Chance of Going Broke", f"{mc['probability_of_ruin']:.0%}",
+            help="Share of 100,000 simulated futures (hunt length, surprise bills, income loss, markets) where savings hit zero.")
+col5.metric("Avg. Shortfall If Broke", f"${mc['expected_shortfall']:,.0f}")
+col6.metric(f"Capital Needed ({mc['confidence']:.0%} Sure)", f"${mc['required_capital']:,.0f}")
+
 st.divider()
 
 # --- THE BURN DOWN CHART ---
 st.subheader("📉 Your Financial Trajectory")
 
-# Generate data points for the chart
-months_range = list(range(0, 19)) # Show 18 months out
-balance_history = []
-current_balance = metrics['current_assets'] - bootcamp_cost # Pay tuition day 1
-
-for m in months_range:
-    if m == 0:
-        balance_history.append(current_balance)
-    else:
-        # Subtract monthly burn
-        current_balance -= metrics['burn_lean']
-        balance_history.append(current_balance)
-
-# Create Plotly Chart
-fig = go.Figure()
-
-# 1. The Money Line
-fig.add_trace(go.Scatter(x=months_range, y=balance_history, mode='lines+markers', 
-                         name='Bank Balance', line=dict(color='#00CC96', width=4)))
-
-# 2. The Danger Zone (Zero Line)
-fig.add_hline(y=0, line_dash="dot", line_color="red", annotation_text="Broke")
-
-# 3. The "Got Hired" Milestone Vertical Line
-fig.add_vline(x=months, line_dash="dash", line_color="white", annotation_text="Planned Hire Date")
-
-# Layout
-fig.update_layout(
-    title="Projected Savings Balance (Lean Mode)",
-    xaxis_title="Months from Quitting",
-    yaxis_title="Liquid Assets ($)",
-    template="plotly_dark",
-    height=400
-)
-
+fig = build_trajectory_figure(*inputs)
 st.plotly_chart(fig, use_container_width=True)
 
+# --- THE DECISION MAP (every timeline / cost combination at once) ---
+st.subheader("🗺️ Your Decision Map")
+cut = st.select_slider("Discretionary Spending Cut During the Hunt", options=[0.0, 0.25, 0.5, 0.75, 1.0],
+                       value=1.0, format_func=lambda c: f"{c:.0%}",
+                       help="Green cells are plans you can already afford; red ones still have a gap.")
+st.plotly_chart(build_sweep_figure(*inputs, cut), use_container_width=True)
+
 # --- THE UPSELL (SMOKE TEST) ---
 st.info(f"💡 Analysis: You are planning for a **{months}-month** transition. Your money runs out in **{metrics['runway']:.1f} months**.")
 
@@ -0,0 +1,158 @@
+"""
+Local stand-in for the Anthropic Messages API, for load tests.
+
+    python -m benchmarks.fake_anthropic --port 8900 --latency 1.2 --error-rate 0.02 --malformed-rate 0.05
+
+Point the backend at it with ANTHROPIC_BASE_URL=http://127.0.0.1:8900.
+Latency is log-normal around --latency seconds; --error-rate answers 529
+(overloaded) and --malformed-rate returns prose instead of JSON.
+Supports plain and streamed (stream=true) requests, and forced tool use:
+with `tools` in the request the answer comes back as a tool_use block
+(malformed answers then ignore the tool and reply in prose).
+"""
+import os
+import json
+import uuid
+import random
+import asyncio
+import argparse
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+LATENCY = float(os.environ.get("FAKE_LATENCY", "1.0"))
+LATENCY_SIGMA = float(os.environ.get("FAKE_LATENCY_SIGMA", "0.3"))
+ERROR_RATE = float(os.environ.get("FAKE_ERROR_RATE", "0.0"))
+MALFORMED_RATE = float(os.environ.get("FAKE_MALFORMED_RATE", "0.0"))
+STREAM_CHUNK = 12
+
+ACTIONS = [
+    "Cut discretionary spending to extend runway by two months",
+    "Pick up 10 hours/week of freelance work in your current field",
+    "Follow a free curriculum before paying for a bootcamp",
+]
+STRATEGY = {
+    "verdict": "Medium Risk",
+    "action_plan": ACTIONS,
+    # Picks from the prompt's catalog shortlist (app/catalog.py); unknown IDs are topped up
+    "resource_ids": ["odin-project", "cs50x"],
+}
+RECOMMENDATION = {
+    "verdict": "Medium Risk",
+    "suggested_actions": ACTIONS,
+    "resource_ids": ["odin-project", "cs50x"],
+}
+STRATEGY_JSON = json.dumps(STRATEGY)
+MALFORMED_TEXT = "I'd be happy to help! Here is my analysis: {verdict: Medium"
+
+app = FastAPI(title="Fake Anthropic")
+stats = {"requests": 0, "errors": 0, "malformed": 0}
+cached_prefixes = set()
+
+
+def completion(body: dict) -> dict:
+    """One content block: the forced tool call, fenced JSON text, or a malformed reply."""
+    if random.random() < MALFORMED_RATE:
+        stats["malformed"] += 1
+        return {"type": "text", "text": MALFORMED_TEXT}
+    tools = body.get("tools")
+    if tools:
+        name = tools[0]["name"]
+        answer = RECOMMENDATION if name == "submit_recommendation" else STRATEGY
+        return {"type": "tool_use", "id": f"toolu_{uuid.uuid4().hex[:24]}", "name": name, "input": answer}
+    return {"type": "text", "text": f"```json\n{STRATEGY_JSON}\n```"}
+
+
+def usage(body: dict, text: str) -> dict:
+    """~4 characters per token. A system block with cache_control makes tools + system
+    a cached prefix: written on first sight, read afterwards (minimum sizes ignored)."""
+    prefix = json.dumps([body.get("tools", []), body.get("system", "")])
+    counts = {"input_tokens": len(json.dumps(body.get("messages", []))) // 4, "output_tokens": len(text) // 4}
+    system = body.get("system")
+    if isinstance(system, list) and any("cache_control" in block for block in system):
+        kind = "cache_read_input_tokens" if prefix in cached_prefixes else "cache_creation_input_tokens"
+        cached_prefixes.add(prefix)
+        counts[kind] = len(prefix) // 4
+    else:
+        counts["input_tokens"] += len(prefix) // 4
+    return counts
+
+
+@app.post("/v1/messages")
+async def messages(request: Request):
+    body = await request.json()
+    stats["requests"] += 1
+    await asyncio.sleep(random.lognormvariate(0, LATENCY_SIGMA) * LATENCY)
+
+    if random.random() < ERROR_RATE:
+        stats["errors"] += 1
+        return JSONResponse(
+            {"type": "error", "error": {"type": "overloaded_error", "message": "Overloaded"}},
+            status_code=529,
+        )
+
+    block = completion(body)
+    text = block.get("text") or json.dumps(block.get("input"))
+    message = {
+        "id": f"msg_{uuid.uuid4().hex[:24]}",
+        "type": "message",
+        "role": "assistant",
+        "model": body.get("model", "fake"),
+        "content": [block],
+        "stop_reason": "tool_use" if block["type"] == "tool_use" else "end_turn",
+        "stop_sequence": None,
+        "usage": usage(body, text),
+    }
+    if not body.get("stream"):
+        return message
+    return StreamingResponse(stream_events(message), media_type="text/event-stream")
+
+
+async def stream_events(message: dict):
+    def sse(event: str, data: dict) -> str:
+        return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+    block = message["content"][0]
+    if block["type"] == "tool_use":
+        text = json.dumps(block["input"])
+        opening = dict(block, input={})
+        delta = lambda piece: {"type": "input_json_delta", "partial_json": piece}
+    else:
+        text = block["text"]
+        opening = {"type": "text", "text": ""}
+        delta = lambda piece: {"type": "text_delta", "text": piece}
+
+    start = dict(message, content=[], stop_reason=None, usage=dict(message["usage"], output_tokens=0))
+    yield sse("message_start", {"type": "message_start", "message": start})
+    yield sse("content_block_start", {"type": "content_block_start", "index": 0, "content_block": opening})
+    for i in range(0, len(text), STREAM_CHUNK):
+        await asyncio.sleep(0.005)
+        yield sse("content_block_delta", {"type": "content_block_delta", "index": 0,
+                                          "delta": delta(text[i:i + STREAM_CHUNK])})
+    yield sse("content_block_stop", {"type": "content_block_stop", "index": 0})
+    yield sse("message_delta", {"type": "message_delta",
+                                "delta": {"stop_reason": message["stop_reason"], "stop_sequence": None},
+                                "usage": {"output_tokens": message["usage"]["output_tokens"]}})
+    yield sse("message_stop", {"type": "message_stop"})
+
+
+@app.get("/stats")
+async def get_stats():
+    return stats
+
+
+def main():
+    global LATENCY, ERROR_RATE, MALFORMED_RATE
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency", type=float, default=LATENCY)
+    parser.add_argument("--error-rate", type=float, default=ERROR_RATE)
+    parser.add_argument("--malformed-rate", type=float, default=MALFORMED_RATE)
+    args = parser.parse_args()
+    LATENCY, ERROR_RATE, MALFORMED_RATE = args.latency, args.error_rate, args.malformed_rate
+
+    import uvicorn
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
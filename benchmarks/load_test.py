@@ -0,0 +1,154 @@
+"""
+Load test: the FastAPI backend against the fake Anthropic server.
+
+    python -m benchmarks.load_test --concurrency 1 8 32 128 --requests 400 --latency 1.0
+
+Starts benchmarks/fake_anthropic.py and the app (python -m app.serve --workers N)
+as subprocesses, then drives POST /analyze at each concurrency level and
+prints throughput, p50/p95/p99 latency, errors, shed (429) responses and
+RSS per worker. Every simulated user sends its own X-Client-ID.
+Profiles are randomized so the strategy cache doesn't hide the API path;
+pass --repeat-profile to measure the cached path instead.
+"""
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+import subprocess
+import httpx
+import numpy as np
+
+
+def random_profile(rng: random.Random) -> dict:
+    return {
+        "current_salary": rng.randrange(1000, 120_000, 1000),
+        "monthly_expenses": rng.randrange(1500, 8000, 50),
+        "current_savings": rng.randrange(0, 150_000, 500),
+        "transition_months": rng.randint(3, 12),
+        "emergency_fund_months": 3,
+    }
+
+
+def start(args: list, env: dict = None) -> subprocess.Popen:
+    return subprocess.Popen([sys.executable, *args], env={**os.environ, **(env or {})},
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def wait_ready(url: str, timeout: float = 20.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(url, timeout=1.0)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up within {timeout}s")
+
+
+def process_tree(pid: int) -> list:
+    """The server pid plus its uvicorn worker children (Linux /proc only)."""
+    pids = [pid]
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            pids += [int(p) for p in f.read().split()]
+    except OSError:
+        pass
+    return pids
+
+
+def rss_mb(pid: int) -> float:
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return float("nan")
+
+
+async def run_level(url: str, concurrency: int, total: int, repeat_profile: bool, seed: int) -> dict:
+    rng = random.Random(seed)
+    fixed = random_profile(rng)
+    latencies, errors, shed = [], 0, 0
+    remaining = iter(range(total))
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, timeout=60.0, limits=limits) as http:
+        async def user(n: int):
+            nonlocal errors, shed
+            headers = {"X-Client-ID": f"load-{concurrency}-{n}"}
+            for _ in remaining:
+                payload = fixed if repeat_profile else random_profile(rng)
+                start_t = time.perf_counter()
+                try:
+                    response = await http.post("/analyze", json=payload, headers=headers)
+                    if response.status_code == 429:
+                        shed += 1
+                    elif response.status_code != 200:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - start_t)
+
+        wall = time.perf_counter()
+        await asyncio.gather(*(user(n) for n in range(concurrency)))
+        wall = time.perf_counter() - wall
+
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000
+    return {"concurrency": concurrency, "requests": total, "errors": errors, "shed": shed,
+            "rps": total / wall, "p50_ms": p50, "p95_ms": p95, "p99_ms": p99}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test /analyze against a fake Anthropic API")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 128])
+    parser.add_argument("--requests", type=int, default=400, help="Requests per concurrency level")
+    parser.add_argument("--workers", type=int, default=1, help="app.serve workers for the backend")
+    parser.add_argument("--latency", type=float, default=1.0, help="Fake API mean latency (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--malformed-rate", type=float, default=0.0)
+    parser.add_argument("--api-port", type=int, default=8900)
+    parser.add_argument("--app-port", type=int, default=8901)
+    parser.add_argument("--repeat-profile", action="store_true")
+    parser.add_argument("--client-rpm", type=float, default=0, help="Per-client limit on the backend (0 = off)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    fake_url = f"http://127.0.0.1:{args.api_port}"
+    app_url = f"http://127.0.0.1:{args.app_port}"
+    fake = start(["-m", "benchmarks.fake_anthropic", "--port", str(args.api_port),
+                  "--latency", str(args.latency), "--error-rate", str(args.error_rate),
+                  "--malformed-rate", str(args.malformed_rate)])
+    state = tempfile.mkdtemp(prefix="careerpivot-load-")
+    server = start(["-m", "app.serve", "--port", str(args.app_port), "--workers", str(args.workers)],
+                   env={"ANTHROPIC_BASE_URL": fake_url,
+                        "LOG_LEVEL": "warning",
+                        "STATE_PATH": os.path.join(state, "state.db"),
+                        "HISTORY_PATH": os.path.join(state, "history.db"),
+                        "CLIENT_RPM": str(args.client_rpm),
+                        # The simulated users all come from here; count them by X-Client-ID
+                        "CLIENT_TRUSTED_PROXIES": "127.0.0.1",
+                        "ANTHROPIC_API_KEY": os.environ.get("ANTHROPIC_API_KEY", "sk-fake")})
+    try:
+        wait_ready(f"{fake_url}/stats")
+        wait_ready(f"{app_url}/health")
+
+        print(f"{'conc':>5} {'reqs':>6} {'err':>5} {'429':>5} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}  rss MB/worker")
+        for level in args.concurrency:
+            r = asyncio.run(run_level(app_url, level, args.requests, args.repeat_profile, args.seed + level))
+            rss = " ".join(f"{rss_mb(pid):.0f}" for pid in process_tree(server.pid))
+            print(f"{r['concurrency']:>5} {r['requests']:>6} {r['errors']:>5} {r['shed']:>5} {r['rps']:>8.1f} "
+                  f"{r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} {r['p99_ms']:>9.1f}  {rss}")
+        print("fake api:", httpx.get(f"{fake_url}/stats").json())
+    finally:
+        for proc in (server, fake):
+            proc.terminate()
+            proc.wait(timeout=10)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Micro-benchmarks of the pure math paths (no network).
+
+    python -m benchmarks.micro                       # print timings
+    python -m benchmarks.micro --save base.json      # record a baseline
+    python -m benchmarks.micro --compare base.json   # exit 1 on a >25% slowdown
+
+Each case reports the best of --repeat runs, per call.
+"""
+import sys
+import json
+import timeit
+import argparse
+from app.models import FinancialProfile
+from app.logic import FinancialBridge
+from app.calculator import FinancialProfile as CalcProfile, TransitionPlan, CareerPivotCalculator
+from app.projection import project_balances
+from app import core
+from app.ledger import run_ledger
+
+PROFILE = FinancialProfile(current_salary=24000, monthly_expenses=3600, current_savings=30000,
+                           transition_months=6, emergency_fund_months=3)
+PROFILES = [
+    FinancialProfile(current_salary=1000.0 * (1 + i % 90), monthly_expenses=1500 + i % 5000,
+                     current_savings=500.0 * i, transition_months=3 + i % 10, emergency_fund_months=3)
+    for i in range(10_000)
+]
+COLUMNS = FinancialBridge.to_columns(PROFILES)
+CORE_PLAN = FinancialBridge.to_core(PROFILE)
+CALCULATOR = CareerPivotCalculator(
+    CalcProfile(20000, 10000, 2000, 0, 2500, 600, 500, "medium"),
+    TransitionPlan("Full Stack Developer", 5000, 6, 400),
+)
+
+
+def memo_miss(fn):
+    """`fn` with core.evaluate's memo emptied before each call, so the math really runs."""
+    def call():
+        core.evaluate.cache_clear()
+        return fn()
+    return call
+
+
+# Constant inputs hit core.evaluate's memo after the first call: "[memo miss]"
+# cases time the math itself, the other ones what a repeated profile costs
+CASES = {
+    "bridge.run_math[memo hit]": (lambda: FinancialBridge.run_math(PROFILE), 2000),
+    "bridge.run_math[memo miss]": (memo_miss(lambda: FinancialBridge.run_math(PROFILE)), 2000),
+    "core.evaluate[memo hit]": (lambda: core.evaluate(*CORE_PLAN), 2000),
+    "core.evaluate[memo miss]": (lambda: core.evaluate.__wrapped__(*CORE_PLAN), 2000),
+    "bridge.run_math_many[10k]": (lambda: FinancialBridge.run_math_many(COLUMNS), 20),
+    "bridge.to_columns[10k]": (lambda: FinancialBridge.to_columns(PROFILES), 5),
+    "ledger.run_ledger[10k]": (lambda: run_ledger(COLUMNS), 5),
+    "calculator.run_simulation[memo hit]": (CALCULATOR.run_simulation, 2000),
+    "calculator.run_simulation[memo miss]": (memo_miss(CALCULATOR.run_simulation), 2000),
+    "calculator.run_sweep[2970]": (CALCULATOR.run_sweep, 500),
+    "calculator.run_monte_carlo[100k]": (lambda: CALCULATOR.run_monte_carlo(seed=0), 3),
+    "project_balances[daily]": (lambda: project_balances(20000, {"a": 3000, "b": 4000}, 12, "daily"), 500),
+}
+REGRESSION_THRESHOLD = 1.25
+
+
+def run(repeat: int) -> dict:
+    results = {}
+    for name, (fn, number) in CASES.items():
+        best = min(timeit.repeat(fn, number=number, repeat=repeat)) / number
+        results[name] = best
+        print(f"{name:<38} {best * 1e6:>12.2f} us/call")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks of the math paths")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--save", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="Baseline JSON to check for regressions")
+    args = parser.parse_args()
+
+    results = run(args.repeat)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressed = [name for name, t in results.items()
+                     if name in baseline and t > baseline[name] * REGRESSION_THRESHOLD]
+        for name in regressed:
+            print(f"REGRESSION {name}: {baseline[name] * 1e6:.2f} -> {results[name] * 1e6:.2f} us/call")
+        sys.exit(1 if regressed else 0)
+
+
+if __name__ == "__main__":
+    main()
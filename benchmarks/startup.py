@@ -0,0 +1,70 @@
+"""
+Cold-start benchmark for the backend.
+
+    python -m benchmarks.startup --runs 5
+
+Measures, in fresh interpreters:
+  * import time of app.main and which heavy libraries it pulled in
+  * time from launching uvicorn to the first 200 from /health, and whether
+    the Anthropic SDK had been loaded by then (it shouldn't be)
+"""
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+import httpx
+
+HEAVY = ("anthropic", "fpdf", "pandas", "plotly", "numpy")
+
+IMPORT_PROBE = f"""
+import sys, json, time
+t = time.perf_counter()
+import app.main
+print(json.dumps({{"seconds": time.perf_counter() - t,
+                  "loaded": [m for m in {HEAVY!r} if m in sys.modules]}}))
+"""
+
+
+def import_time() -> dict:
+    out = subprocess.run([sys.executable, "-c", IMPORT_PROBE], capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def time_to_health(port: int) -> dict:
+    start = time.perf_counter()
+    server = subprocess.Popen([sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port),
+                               "--log-level", "warning"],
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while True:
+            try:
+                health = httpx.get(f"http://127.0.0.1:{port}/health", timeout=1.0).json()
+                return {"seconds": time.perf_counter() - start, "ai_client": health.get("ai_client")}
+            except httpx.HTTPError:
+                if server.poll() is not None:
+                    raise RuntimeError("uvicorn exited before serving /health")
+                time.sleep(0.01)
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backend cold-start benchmark")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8902)
+    args = parser.parse_args()
+
+    imports = [import_time() for _ in range(args.runs)]
+    health = [time_to_health(args.port) for _ in range(args.runs)]
+
+    print(f"import app.main      median {statistics.median(r['seconds'] for r in imports) * 1000:8.1f} ms"
+          f"   heavy modules loaded: {imports[-1]['loaded'] or 'none'}")
+    print(f"launch -> /health    median {statistics.median(r['seconds'] for r in health) * 1000:8.1f} ms"
+          f"   ai client: {health[-1]['ai_client']}")
+
+
+if __name__ == "__main__":
+    main()
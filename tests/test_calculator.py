@@ -0,0 +1,23 @@
+import warnings
+import numpy as np
+from app.calculator import CareerPivotCalculator, FinancialProfile, TransitionPlan
+from app.core import NO_BURN_RUNWAY
+
+
+def test_run_sweep_without_burn_or_savings():
+    profile = FinancialProfile(0, 0, 0, 0, 0, 0, 0, "medium")
+    calculator = CareerPivotCalculator(profile, TransitionPlan("Analyst", 0, 6, 0))
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        sweep = calculator.run_sweep()
+    assert np.all(sweep["runway"] == NO_BURN_RUNWAY)
+
+
+def test_run_sweep_full_cut_matches_run_simulation():
+    profile = FinancialProfile(20_000, 5_000, 1_000, 0, 2_500, 500, 400, "high")
+    plan = TransitionPlan("Data Analyst", 3_000, 6, 400)
+    sweep = CareerPivotCalculator(profile, plan).run_sweep(months=[6], risks=["high"], discretionary_cuts=[1.0],
+                                                           education_costs=[3_000])
+    metrics = CareerPivotCalculator(profile, plan).run_simulation()["metrics"]
+    assert sweep["runway"][0, 0, 0, 0] == metrics["runway"]
+    assert sweep["gap"][0, 0, 0, 0] == metrics["gap"]
@@ -0,0 +1,78 @@
+import random
+import numpy as np
+import pytest
+from app.core import (Household, Numbers, Transition, evaluate, evaluate_many, risk_multiplier, rows,
+                      NO_BURN_RUNWAY)
+
+RISKS = (None, "low", "medium", "high", "unknown")
+
+
+def random_plan(rng: random.Random):
+    household = Household(
+        cash_savings=round(rng.uniform(0, 80_000), 2),
+        brokerage_taxable=rng.choice((0.0, round(rng.uniform(0, 60_000), 2))),
+        spouse_net_income=rng.choice((0.0, round(rng.uniform(0, 6_000), 2))),
+        passive_income=rng.choice((0.0, round(rng.uniform(0, 800), 2))),
+        fixed_expenses=round(rng.uniform(500, 5_000), 2),
+        variable_expenses=rng.choice((0.0, round(rng.uniform(0, 2_000), 2))),
+        discretionary_expenses=rng.choice((0.0, round(rng.uniform(0, 1_500), 2))),
+        risk_tolerance=rng.choice(RISKS),
+        new_salary=rng.choice((None, 0.0, round(rng.uniform(40_000, 160_000), 2))),
+    )
+    transition = Transition(
+        target_role="Software Engineer",
+        upskilling_cost=rng.choice((0.0, round(rng.uniform(0, 20_000), 2))),
+        estimated_months=rng.randint(1, 24),
+        health_insurance_gap=rng.choice((0.0, round(rng.uniform(0, 900), 2))),
+        emergency_fund_months=rng.choice((0, 3, 6)),
+        tuition_installments=rng.randint(1, 12),
+    )
+    return household, transition
+
+
+def to_columns(plans) -> dict:
+    """The columnar input for a list of (household, transition) pairs, zero columns left out."""
+    columns = {}
+    numeric = [f for f in Household._fields if f != "risk_tolerance"] + \
+              [f for f in Transition._fields if f != "target_role"]
+    for name in numeric:
+        values = [getattr(h if name in Household._fields else t, name) or 0.0 for h, t in plans]
+        if any(values) or name == "estimated_months":
+            columns[name] = np.array(values, dtype=float)
+    columns["risk_multiplier"] = np.array([risk_multiplier(h.risk_tolerance) for h, _ in plans])
+    return columns
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_evaluate_many_matches_evaluate(seed):
+    rng = random.Random(seed)
+    plans = [random_plan(rng) for _ in range(400)]
+    expected = [evaluate.__wrapped__(h, t) for h, t in plans]
+    got = rows(evaluate_many(to_columns(plans)))
+
+    assert len(got) == len(expected)
+    for e, g in zip(expected, got):
+        assert isinstance(g, Numbers)
+        for field in ("burn_rate", "comfort_burn_rate", "required_capital", "liquid_assets", "gap",
+                      "runway_months", "min_balance"):
+            assert getattr(g, field) == pytest.approx(getattr(e, field), rel=1e-9, abs=1e-6), field
+        assert (g.is_ready, g.min_balance_month, g.break_even_month) == \
+               (e.is_ready, e.min_balance_month, e.break_even_month)
+
+
+def test_evaluate_is_memoized_by_value():
+    household, transition = random_plan(random.Random(42))
+    evaluate.cache_clear()
+    first = evaluate(household, transition)
+    again = evaluate(Household(*household), Transition(*transition))
+    assert again is first
+    assert evaluate.cache_info().hits == 1
+
+
+def test_no_burn_runway():
+    household = Household(cash_savings=10_000, brokerage_taxable=0, spouse_net_income=5_000, passive_income=0,
+                          fixed_expenses=3_000, variable_expenses=1_000, discretionary_expenses=0)
+    numbers = evaluate.__wrapped__(household, Transition("Analyst", 0, 6, 0))
+    assert numbers.burn_rate == 0
+    assert numbers.runway_months == NO_BURN_RUNWAY
+    assert numbers.is_ready
@@ -0,0 +1,122 @@
+import random
+import numpy as np
+import pytest
+from app.ledger import LedgerAssumptions, NEVER, run_ledger
+
+FIELDS = ("cash_savings", "brokerage_taxable", "spouse_net_income", "passive_income", "fixed_expenses",
+          "variable_expenses", "discretionary_expenses", "new_salary", "upskilling_cost", "estimated_months",
+          "health_insurance_gap", "tuition_installments")
+
+
+def naive_ledger(p: dict, a: LedgerAssumptions = LedgerAssumptions()) -> dict:
+    """One profile, one month at a time: the obvious way to write the ledger."""
+    get = lambda name: p.get(name, 0.0)
+    hire = get("estimated_months")
+    installments = max(p.get("tuition_installments", 1.0), 1.0)
+    take_home = get("new_salary") * (1 - a.salary_tax_rate) / 12
+    cash, brokerage = get("cash_savings"), get("brokerage_taxable")
+    start = cash + brokerage
+    keep = 1 - a.capital_gains_drag
+    balances, tax = [], 0.0
+    for t in range(a.horizon_months + 1):
+        hired = t > hire
+        out = 0.0
+        if t >= 1:
+            out += get("fixed_expenses") + get("variable_expenses") - get("spouse_net_income") - get("passive_income")
+        if hired:
+            out += get("discretionary_expenses")
+        if t < installments:
+            out += get("upskilling_cost") / installments
+        if t >= 1 and not hired:
+            out += get("health_insurance_gap") * (1.0 if t <= a.cobra_months else a.post_cobra_premium_factor)
+        if hired and get("new_salary") <= 0:
+            out = 0.0
+        else:
+            out -= min(max((t - hire) / a.salary_ramp_months, 0.0), 1.0) * take_home
+        cash -= out
+        if cash < 0 and brokerage > 0:
+            # Sell just enough to cover the shortfall after the capital-gains drag
+            gross = min(-cash / keep, brokerage)
+            cash += gross * keep
+            brokerage -= gross
+            tax += gross * a.capital_gains_drag
+        balances.append(cash + brokerage)
+
+    min_month = min(range(len(balances)), key=lambda m: (balances[m], m))
+    break_even = next((m for m, b in enumerate(balances) if m > hire and b >= start), NEVER)
+    return {"min_balance": balances[min_month], "min_balance_month": min_month, "break_even_month": break_even,
+            "tax_paid": tax, "balances": balances}
+
+
+def random_profile(rng: random.Random, absent=()) -> dict:
+    profile = {
+        "cash_savings": round(rng.uniform(0, 60_000), 2),
+        "brokerage_taxable": round(rng.uniform(0, 60_000), 2),
+        "spouse_net_income": round(rng.uniform(0, 5_000), 2),
+        "passive_income": round(rng.uniform(0, 500), 2),
+        "fixed_expenses": round(rng.uniform(1_000, 5_000), 2),
+        "variable_expenses": round(rng.uniform(0, 2_000), 2),
+        "discretionary_expenses": round(rng.uniform(0, 1_500), 2),
+        "new_salary": rng.choice((0.0, round(rng.uniform(30_000, 180_000), 2))),
+        "upskilling_cost": round(rng.uniform(0, 20_000), 2),
+        "estimated_months": float(rng.randint(1, 30)),
+        "health_insurance_gap": round(rng.uniform(0, 900), 2),
+        "tuition_installments": float(rng.randint(1, 12)),
+    }
+    for name in absent:
+        profile.pop(name)
+    return profile
+
+
+def columns_of(profiles: list) -> dict:
+    return {name: np.array([p[name] for p in profiles]) for name in profiles[0]}
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_run_ledger_matches_month_loop(seed):
+    rng = random.Random(seed)
+    for _ in range(40):
+        # Absent columns must behave like zeros (one installment)
+        absent = rng.sample([f for f in FIELDS if f != "estimated_months"], rng.randint(0, 4))
+        batch = [random_profile(rng, absent) for _ in range(10)]
+        result = run_ledger(columns_of(batch), keep_balances=True)
+        for i, p in enumerate(batch):
+            expected = naive_ledger(p)
+            assert result["balances"][:, i] == pytest.approx(expected["balances"], rel=1e-9, abs=1e-6)
+            assert result["min_balance"][i] == pytest.approx(expected["min_balance"], rel=1e-9, abs=1e-6)
+            assert result["tax_paid"][i] == pytest.approx(expected["tax_paid"], rel=1e-9, abs=1e-6)
+            assert result["min_balance_month"][i] == expected["min_balance_month"]
+            assert result["break_even_month"][i] == expected["break_even_month"]
+
+
+def test_other_assumptions():
+    a = LedgerAssumptions(horizon_months=48, cobra_months=6, post_cobra_premium_factor=1.5, salary_ramp_months=1,
+                          salary_tax_rate=0.35, capital_gains_drag=0.15)
+    rng = random.Random(7)
+    profiles = [random_profile(rng) for _ in range(20)]
+    result = run_ledger(columns_of(profiles), a, keep_balances=True)
+    for i, p in enumerate(profiles):
+        assert result["balances"][:, i] == pytest.approx(naive_ledger(p, a)["balances"], rel=1e-9, abs=1e-6)
+
+
+@pytest.mark.parametrize("salary", [None, 0.0])
+def test_no_salary_stops_at_hire(salary):
+    profile = {"cash_savings": 30_000.0, "brokerage_taxable": 10_000.0, "fixed_expenses": 3_000.0,
+               "discretionary_expenses": 500.0, "health_insurance_gap": 400.0, "estimated_months": 6.0}
+    if salary is not None:
+        profile["new_salary"] = salary
+    result = run_ledger({k: np.array([v]) for k, v in profile.items()}, keep_balances=True)
+    balances = result["balances"][:, 0]
+    # No made-up losses after the hire month, and no break-even without a paycheck
+    assert np.all(balances[7:] == balances[6])
+    assert balances[6] == pytest.approx(40_000 - 6 * 3_400)
+    assert result["break_even_month"][0] == NEVER
+    assert result["min_balance_month"][0] == 6
+
+
+def test_salary_breaks_even():
+    profile = {"cash_savings": 30_000.0, "fixed_expenses": 3_000.0, "estimated_months": 6.0,
+               "new_salary": 120_000.0}
+    result = run_ledger({k: np.array([v]) for k, v in profile.items()})
+    expected = naive_ledger(profile)
+    assert result["break_even_month"][0] == expected["break_even_month"] != NEVER
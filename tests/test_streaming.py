@@ -0,0 +1,66 @@
+import json
+import pytest
+from app.streaming import StrategyStreamParser
+
+STRATEGY = {
+    "verdict": "Medium Risk",
+    "action_plan": [
+        "Freelance 10h/week",
+        'Ask for a "bridge" contract {part-time} [3 months]',
+        "Cut dining out \\ streaming, save ~$400/month",
+        "Apply to 5 roles/week — café meetups, 日本語 OK",
+    ],
+    "resources": [
+        {"name": "The Odin Project", "cost": "Free", "url": "https://www.theodinproject.com"},
+        {"name": "Book {2nd ed.}", "cost": "$30 \"used\"", "tags": ["a", {"b": "}"}]},
+    ],
+    "resource_ids": ["odin-project", "cs50x"],
+    "notes": {"verdict": "not this one", "action_plan": ["nor this"]},
+}
+
+EXPECTED = (
+    [("verdict", STRATEGY["verdict"])]
+    + [("action", a) for a in STRATEGY["action_plan"]]
+    + [("resource", r) for r in STRATEGY["resources"]]
+    + [("resource_id", r) for r in STRATEGY["resource_ids"]]
+)
+
+
+def documents():
+    compact = json.dumps(STRATEGY, ensure_ascii=False)
+    yield compact
+    yield json.dumps(STRATEGY, indent=2)  # \u escapes, newlines between values
+    yield 'Here is the plan:\n```json\n' + json.dumps(STRATEGY, indent=1, ensure_ascii=False) + "\n```\nGood luck {!}"
+
+
+def feed_in_chunks(document: str, size: int) -> list:
+    parser = StrategyStreamParser()
+    events = []
+    for start in range(0, len(document), size):
+        events += parser.feed(document[start:start + size])
+    return events
+
+
+@pytest.mark.parametrize("document", list(documents()))
+def test_whole_document(document):
+    assert StrategyStreamParser().feed(document) == EXPECTED
+
+
+@pytest.mark.parametrize("document", list(documents()))
+def test_every_chunk_size_matches_whole_document(document):
+    for size in range(1, len(document) + 1):
+        assert feed_in_chunks(document, size) == EXPECTED, size
+
+
+def test_events_arrive_as_soon_as_complete():
+    document = json.dumps(STRATEGY)
+    verdict_end = document.index('"Medium Risk"') + len('"Medium Risk"')
+    parser = StrategyStreamParser()
+    assert parser.feed(document[:verdict_end - 1]) == []
+    assert parser.feed(document[verdict_end - 1:verdict_end]) == [("verdict", "Medium Risk")]
+
+
+def test_truncated_document_keeps_complete_events():
+    document = json.dumps(STRATEGY)
+    cut = document.index("cs50x")
+    assert StrategyStreamParser().feed(document[:cut]) == EXPECTED[:-1]